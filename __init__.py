@@ -4,14 +4,22 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .const import DOMAIN, STORAGE_KEY, STORAGE_VERSION
 from homeassistant.const import CONF_HOST
 from .grenton import GrentonClient
-
-# TODO List the platforms that you want to support.
-# For your initial PR, limit it to 1 platform.
-PLATFORMS: list[Platform] = [Platform.SWITCH]
+from .hub import GrentonHub
+
+PLATFORMS: list[Platform] = [
+    Platform.SWITCH,
+    Platform.SENSOR,
+    Platform.LIGHT,
+    Platform.CLIMATE,
+    Platform.COVER,
+    Platform.NUMBER,
+    Platform.BINARY_SENSOR,
+]
 
 CONF_ENCRYPTION_KEY = 'encryption_key'
 CONF_INIT_VECTOR = 'init_vector'
@@ -29,42 +37,42 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Initialize your client using the host, encryption key, and initialization vector
     client = GrentonClient(host, base64_key=key, base64_iv=iv)
 
+    # Entities are created from the last known module list, discovery runs afterwards
+    hub = GrentonHub(hass, entry, client)
+    await hub.async_load()
+
     # Store the client instance in hass.data under your integration's domain
     hass.data[DOMAIN][entry.entry_id] = {
-        'client': client
+        'client': client,
+        'hub': hub,
     }
-    # modules = await client.list_modules()
-    # switches = []
-    # lights = []
-    # thermostats = []
-    # sensors = []
-
-    # hass.data[DOMAIN][entry.entry_id] = {
-    #     'client': client,
-    #     'module_list': modules,
-
-    # }
-
-    # Add platforms (e.g., switches, sensors) to Home Assistant
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "switch")
-    )
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "sensor")
-    )
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "light")
-    )
-    hass.async_create_task(
-        hass.config_entries.async_forward_entry_setup(entry, "climate")
-    )
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # A single discovery for all platforms, startup does not wait for it
+    entry.async_create_background_task(hass, hub.async_discover(), f"{DOMAIN}_discovery")
+    # Cheap periodic check for a re-sent project, and CLU health tracking
+    hub.async_start()
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        data['client'].close()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the cached module list of a removed entry."""
+    await Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry.entry_id)).async_remove()
@@ -0,0 +1,46 @@
+import logging
+from .const import DOMAIN
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from .entity import GrentonEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+BINARY_SENSOR_TYPES = {'d_in', 'touch_btn'}
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Set up the binary sensors from a config entry."""
+    _LOGGER.debug("Setting up binary sensors from config entry")
+
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
+
+    def create_binary_sensors(module):
+        # Inputs go on the fast poller, they are expected to react within a second
+        if module['type'] in BINARY_SENSOR_TYPES:
+            return [GrentonBinarySensor(hub.fast_poller, module)]
+        return []
+
+    hub.async_add_entities_for(async_add_entities, create_binary_sensors)
+
+class GrentonBinarySensor(GrentonEntity, BinarySensorEntity):
+    """Representation of a digital input."""
+
+    def __init__(self, poller, module):
+        """Initialize the binary sensor."""
+        super().__init__(poller, module)
+        self._attr_unique_id = module['id']
+        self._state = None
+
+    @property
+    def is_on(self):
+        """Return true if the input is active."""
+        return self._state
+
+    def _restore_state(self, last_state):
+        """Show the last known input state until the first poll."""
+        if last_state.state in ('on', 'off'):
+            self._state = last_state.state == 'on'
+
+    def _update_from_state(self, state):
+        """Apply polled state data for the binary sensor."""
+        if state['state'] is not None:
+            self._state = state['state'] == 1
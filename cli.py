@@ -0,0 +1,205 @@
+"""Command line access to a CLU without Home Assistant.
+
+    python cli.py --host 192.168.1.10 --key KEY --iv IV modules
+    python cli.py --host 192.168.1.10 --key KEY --iv IV get DOU1234:0 LED5678:3
+    python cli.py --host 192.168.1.10 --key KEY --iv IV set values.json
+    python cli.py --simulate load --duration 10 --concurrency 8 --batch 40
+
+Values to set are read from a JSON list of {"id", "index", "value"} objects.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from base64 import b64encode
+
+try:
+    from .grenton import GrentonClient, OBJECT_ATTRIBUTES, attribute_keys
+    from .simulator import start_simulator
+except ImportError:
+    from grenton import GrentonClient, OBJECT_ATTRIBUTES, attribute_keys
+    from simulator import start_simulator
+
+
+def parse_key(text):
+    """Turn MODULE:INDEX into a fetch key."""
+    module_id, _, index = text.rpartition(':')
+    if not module_id:
+        raise argparse.ArgumentTypeError(f'expected MODULE:INDEX, got {text!r}')
+    return module_id, int(index)
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def cmd_modules(client, args):
+    modules = await client.list_modules()
+    if modules is None:
+        print('Could not read the module list', file=sys.stderr)
+        return 1
+    print(json.dumps(modules, indent=2))
+    return 0
+
+
+async def cmd_get(client, args):
+    keys = set(args.keys)
+    if args.all:
+        modules = await client.list_modules() or []
+        for module in modules:
+            if module['type'] in OBJECT_ATTRIBUTES:
+                keys |= attribute_keys(module)
+    if not keys:
+        print('Nothing to fetch, give MODULE:INDEX keys or --all', file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    values = await client.fetch_values(keys)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({f'{module_id}:{index}': value for (module_id, index), value in sorted(values.items())}, indent=2))
+    print(f'{len(values)}/{len(keys)} values in {elapsed * 1000:.0f} ms', file=sys.stderr)
+    return 0 if len(values) == len(keys) else 1
+
+
+async def cmd_set(client, args):
+    with open(args.file) as handle:
+        items = json.load(handle)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def apply(item):
+        async with semaphore:
+            return await client.set_module_value(item['id'], item['index'], item['value'])
+
+    results = await asyncio.gather(*(apply(item) for item in items))
+    for item, ok in zip(items, results):
+        if not ok:
+            print(f"Failed: {item['id']}:{item['index']} = {item['value']}", file=sys.stderr)
+    print(f'{sum(results)}/{len(items)} values set', file=sys.stderr)
+    return 0 if all(results) else 1
+
+
+async def cmd_load(client, args):
+    """Fire batched fetches for a while and report throughput and latency."""
+    if args.keys:
+        keys = list(args.keys)
+    elif args.simulate:
+        keys = []
+    else:
+        modules = await client.list_modules() or []
+        keys = sorted(key for module in modules if module['type'] in OBJECT_ATTRIBUTES for key in attribute_keys(module))
+    if not keys:
+        # Nothing known about the project, make up keys (fine for the simulator)
+        keys = [(f'DOU{i:04d}', 0) for i in range(args.batch)]
+
+    latencies = []
+    failures = 0
+    values_read = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker(offset):
+        nonlocal failures, values_read
+        # Sends are scheduled against a clock, so latency does not eat into the rate
+        next_send = time.perf_counter() + offset
+        while time.perf_counter() < deadline:
+            if args.rate:
+                await asyncio.sleep(max(0, next_send - time.perf_counter()))
+                next_send += args.concurrency / args.rate
+                if time.perf_counter() >= deadline:
+                    break
+            batch = random.sample(keys, min(args.batch, len(keys)))
+            start = time.perf_counter()
+            values = await client.fetch_values(batch)
+            if len(values) == len(batch):
+                latencies.append(time.perf_counter() - start)
+                values_read += len(batch)
+            else:
+                failures += 1
+
+    start = time.perf_counter()
+    # Workers start staggered so a target rate is spread evenly
+    offsets = [i / args.rate if args.rate else 0 for i in range(args.concurrency)]
+    await asyncio.gather(*(worker(offset) for offset in offsets))
+    elapsed = time.perf_counter() - start
+
+    total = len(latencies) + failures
+    print(f'requests:   {total} ({failures} failed) in {elapsed:.1f} s')
+    print(f'throughput: {len(latencies) / elapsed:.1f} batches/s, {values_read / elapsed:.0f} values/s')
+    print(f'latency ms: p50 {percentile(latencies, 0.5) * 1000:.1f}  '
+          f'p95 {percentile(latencies, 0.95) * 1000:.1f}  '
+          f'p99 {percentile(latencies, 0.99) * 1000:.1f}  '
+          f'max {max(latencies, default=0) * 1000:.1f}')
+    return 0 if not failures else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', help='CLU address')
+    parser.add_argument('--port', type=int, default=1234)
+    parser.add_argument('--key', default=os.environ.get('GRENTON_KEY'), help='base64 encryption key (or GRENTON_KEY)')
+    parser.add_argument('--iv', default=os.environ.get('GRENTON_IV'), help='base64 init vector (or GRENTON_IV)')
+    parser.add_argument('--interval', type=float, default=0.1, help='minimum seconds between commands')
+    parser.add_argument('--simulate', action='store_true', help='run against a local simulated CLU')
+    parser.add_argument('--latency', type=float, default=0.0, help='reply delay of the simulated CLU, seconds')
+    parser.add_argument('--debug', action='store_true')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('modules', help='dump the module inventory')
+
+    get = sub.add_parser('get', help='fetch values in bulk')
+    get.add_argument('keys', nargs='*', type=parse_key, metavar='MODULE:INDEX')
+    get.add_argument('--all', action='store_true', help='every known attribute of every module')
+
+    set_ = sub.add_parser('set', help='apply values from a JSON file')
+    set_.add_argument('file')
+    set_.add_argument('--concurrency', type=int, default=4)
+
+    load = sub.add_parser('load', help='generate fetch load and report throughput')
+    load.add_argument('keys', nargs='*', type=parse_key, metavar='MODULE:INDEX')
+    load.add_argument('--duration', type=float, default=10)
+    load.add_argument('--concurrency', type=int, default=1, help='requests in flight')
+    load.add_argument('--batch', type=int, default=40, help='values per request')
+    load.add_argument('--rate', type=float, default=0, help='target batches per second, 0 for as fast as possible')
+    return parser
+
+
+COMMANDS = {
+    'modules': cmd_modules,
+    'get': cmd_get,
+    'set': cmd_set,
+    'load': cmd_load,
+}
+
+
+async def run(args):
+    simulator = None
+    host, port = args.host, args.port
+    if args.simulate:
+        args.key = args.key or b64encode(os.urandom(16)).decode()
+        args.iv = args.iv or b64encode(os.urandom(16)).decode()
+        simulator, _, port = await start_simulator(args.key, args.iv, latency=args.latency)
+        host = '127.0.0.1'
+    if not host or not args.key or not args.iv:
+        print('--host, --key and --iv are required unless --simulate is used', file=sys.stderr)
+        return 2
+
+    client = GrentonClient(host, udp_port=port, base64_key=args.key, base64_iv=args.iv,
+                           debug=args.debug, command_interval=args.interval)
+    try:
+        return await COMMANDS[args.command](client, args)
+    finally:
+        client.close()
+        if simulator is not None:
+            simulator.close()
+
+
+def main():
+    return asyncio.run(run(build_parser().parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
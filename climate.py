@@ -2,7 +2,8 @@ import logging
 from typing import Any
 from .const import DOMAIN
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.components.climate import ClimateEntity, HVACMode, HVACAction, ClimateEntityFeature, PRESET_AWAY, PRESET_HOME
+from homeassistant.components.climate import ATTR_CURRENT_TEMPERATURE, ATTR_PRESET_MODE, ClimateEntity, HVACMode, HVACAction, ClimateEntityFeature, PRESET_AWAY, PRESET_HOME
+from .entity import GrentonEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,26 +16,18 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the thermostats from a config entry."""
     _LOGGER.debug("Setting up thermostats from config entry")
 
-    client = hass.data[DOMAIN][config_entry.entry_id]['client']
-    # Get list of connected modules
-    modules = await client.list_modules()
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
 
-    thermostats = []
-    for module in modules:
+    def create_thermostats(module):
         # Check if the module has thermostat capability
         if module['type'] == 'thermostat':
-            new_thermostat = GrentonThermostat(client, module)
-            thermostats.append(new_thermostat)
+            return [GrentonThermostat(hub.poller, module)]
+        return []
 
-    if thermostats:
-        _LOGGER.debug("Adding thermostat entities")
-        async_add_entities(thermostats)
-    else:
-        _LOGGER.debug("No thermostat entities available")
+    hub.async_add_entities_for(async_add_entities, create_thermostats)
 
-class GrentonThermostat(ClimateEntity):
+class GrentonThermostat(GrentonEntity, ClimateEntity):
     """Representation of a thermostat."""
-    _attr_has_entity_name = True
     _attr_supported_features = (
         ClimateEntityFeature.TARGET_TEMPERATURE
         | ClimateEntityFeature.PRESET_MODE
@@ -47,19 +40,12 @@ class GrentonThermostat(ClimateEntity):
     _attr_preset_mode = PRESET_HOME
     _attr_preset_modes = [PRESET_HOME, PRESET_AWAY]
 
-    def __init__(self, client, module):
+    def __init__(self, poller, module):
         """Initialize the thermostat."""
-        self._client = client
-        self._module = module
-        self._name = module['name']
+        super().__init__(poller, module)
         self._attr_unique_id = module['id']
         self._state = None
 
-    @property
-    def name(self):
-        """Return the name of the thermostat."""
-        return self._name
-
     @property
     def is_on(self):
         """Return true if the thermostat is on."""
@@ -75,9 +61,20 @@ class GrentonThermostat(ClimateEntity):
                     await self.async_set_hvac_mode(HVACMode.HEAT)
                 await self._client.set_module_value(self._module['id'], GRENTON_POINT_VALUE_ATTR, temp)
             self._attr_target_temperature = temp
-
-    async def async_update(self) -> None:
-        state = await self._client.get_thermo_values(self._module['id'])
+            self._async_write_optimistic()
+
+    def _restore_state(self, last_state) -> None:
+        """Show the last known thermostat state until the first poll."""
+        if last_state.state in self._attr_hvac_modes:
+            self._attr_hvac_mode = HVACMode(last_state.state)
+        if last_state.attributes.get(ATTR_PRESET_MODE) in self._attr_preset_modes:
+            self._attr_preset_mode = last_state.attributes[ATTR_PRESET_MODE]
+        self._attr_current_temperature = last_state.attributes.get(ATTR_CURRENT_TEMPERATURE)
+        self._attr_target_temperature = last_state.attributes.get(ATTR_TEMPERATURE)
+
+    def _update_from_state(self, state) -> None:
+        if None in state.values():
+            return
         self._attr_current_temperature = state['currentTemp']
 
         self._attr_target_temperature = state['setTemp']
@@ -104,9 +101,11 @@ class GrentonThermostat(ClimateEntity):
 
     async def async_turn_on(self) -> None:
         await self._client.set_module_value(self._module['id'], GRENTON_STATE_ATTR, 1)
+        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self) -> None:
         await self._client.set_module_value(self._module['id'], GRENTON_STATE_ATTR, 0)
+        await self.coordinator.async_request_refresh()
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         if hvac_mode == HVACMode.OFF:
@@ -119,10 +118,12 @@ class GrentonThermostat(ClimateEntity):
             if hvac_mode == HVACMode.AUTO:
                 await self._client.set_module_value(self._module['id'], GRENTON_MODE_ATTR, 2)
                 await self.async_set_preset_mode(PRESET_HOME)
+        await self.coordinator.async_request_refresh()
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         if preset_mode == PRESET_AWAY:
             await self._client.set_thermo_away_mode(self._module['id'], True)
         else:
             await self._client.set_thermo_away_mode(self._module['id'], False)
+        await self.coordinator.async_request_refresh()
 
@@ -8,13 +8,13 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import CONF_COMPACT_SNAPSHOT, DOMAIN
 
-from .grenton import GrentonClient
+from .grenton import GrentonClient, discover_clus
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,9 +22,11 @@ _LOGGER = logging.getLogger(__name__)
 
 CONF_ENCRYPTION_KEY = 'encryption_key'
 CONF_INIT_VECTOR = 'init_vector'
+CONF_CLU = 'clu'
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
-        vol.Required(CONF_HOST): str,
+        # Leave the host empty to scan the local network for CLUs
+        vol.Optional(CONF_HOST, default=''): str,
         vol.Required(CONF_ENCRYPTION_KEY): str,
         vol.Required(CONF_INIT_VECTOR): str,
     }
@@ -42,11 +44,16 @@ class PlaceholderHub:
         self.host = host
         self.client = GrentonClient(host)
 
-    async def authenticate(self, username: str, password: str) -> bool:
-        """Test if we can authenticate with the host."""
+    async def authenticate(self, username: str, password: str) -> str | bool:
+        """Test if we can authenticate with the host.
+
+        checkAlive() is encrypted, so any answer proves the key. It answers
+        with the serial number of the CLU, the same reply the network scan
+        gets, so both ways of adding a CLU give it the same unique id.
+        """
         self.client.update_keys(username, password)
 
-        return await self.client.get_clu_id()
+        return await self.client.ping()
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
@@ -64,15 +71,13 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     hub = PlaceholderHub(data[CONF_HOST])
 
-    if not await hub.authenticate(data[CONF_ENCRYPTION_KEY], data[CONF_INIT_VECTOR]):
+    # A single probe, the serial number it returns is reused for the entry
+    try:
+        sn = await hub.authenticate(data[CONF_ENCRYPTION_KEY], data[CONF_INIT_VECTOR])
+    finally:
+        hub.client.close()
+    if not sn:
         raise InvalidAuth
-
-    # If you cannot connect:
-    # throw CannotConnect
-    # If the authentication is wrong:
-    # InvalidAuth
-
-    sn = await hub.authenticate(data[CONF_ENCRYPTION_KEY], data[CONF_INIT_VECTOR])
     # Return info that you want to store in the config entry.
     return {"sn": sn}
 
@@ -82,6 +87,42 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._user_input: dict[str, Any] = {}
+        # Host -> checkAlive() reply of the CLUs found by the scan
+        self._found: dict[str, str] = {}
+
+    async def _async_create(self, user_input: dict[str, Any], sn: str) -> FlowResult:
+        """Create the entry for a CLU whose key was already proven."""
+        await self.async_set_unique_id(str(sn))
+        self._abort_if_unique_id_configured(updates={CONF_HOST: user_input[CONF_HOST]})
+        # Encryption key and initialization vector are valid, create config entry
+        return self.async_create_entry(title=sn, data=user_input)
+
+    async def _async_validate_and_create(
+        self, user_input: dict[str, Any], errors: dict[str, str]
+    ) -> FlowResult | None:
+        """Validate a host and create the entry, fill `errors` on failure."""
+        try:
+            info = await validate_input(self.hass, user_input)
+        except CannotConnect:
+            errors["base"] = "cannot_connect"
+        except InvalidAuth:
+            errors["base"] = "invalid_auth"
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected exception")
+            errors["base"] = "unknown"
+        if errors:
+            return None
+        return await self._async_create(user_input, info["sn"])
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -93,31 +134,53 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors[CONF_ENCRYPTION_KEY] = 'Invalid encryption key, must be 24 characters long'
             if len(user_input.get(CONF_INIT_VECTOR, '')) != 24:
                 errors[CONF_INIT_VECTOR] = 'Invalid initialization vector, must be 24 characters long'
-            if not errors: # We don't want to try and connect with invalid inputs
+            if not errors and not user_input.get(CONF_HOST):
+                # No host given, look for CLUs that answer with this key
+                self._user_input = user_input
                 try:
-                    info = await validate_input(self.hass, user_input)
-                except CannotConnect:
-                    errors["base"] = "cannot_connect"
-                except InvalidAuth:
-                    errors["base"] = "invalid_auth"
+                    found = await discover_clus(user_input[CONF_ENCRYPTION_KEY], user_input[CONF_INIT_VECTOR])
                 except Exception:  # pylint: disable=broad-except
-                    _LOGGER.exception("Unexpected exception")
-                    errors["base"] = "unknown"
-            if errors:
-                return self.async_show_form(
-                    step_id='user',
-                    data_schema=STEP_USER_DATA_SCHEMA,
-                    errors=errors
-                )
-
-            else:
-            # Encryption key and initialization vector are valid, create config entry
-                return self.async_create_entry(title=info["sn"], data=user_input)
+                    _LOGGER.exception("Network scan failed")
+                    found = []
+                # CLUs already set up are not offered again
+                entries = self._async_current_entries()
+                configured = {entry.data.get(CONF_HOST) for entry in entries} | {entry.unique_id for entry in entries}
+                self._found = {
+                    clu['host']: clu['alive'] for clu in found
+                    if clu['host'] not in configured and clu['alive'] not in configured
+                }
+                if not self._found:
+                    errors["base"] = "no_devices_found"
+                else:
+                    return await self.async_step_pick()
+            if not errors: # We don't want to try and connect with invalid inputs
+                if result := await self._async_validate_and_create(user_input, errors):
+                    return result
+            return self.async_show_form(
+                step_id='user',
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors=errors
+            )
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Let the user choose one of the CLUs found on the network."""
+        if user_input is not None:
+            # The scan already proved the key, its checkAlive() reply is reused
+            host = user_input[CONF_CLU]
+            return await self._async_create({**self._user_input, CONF_HOST: host}, self._found[host])
+
+        choices = {host: f"{host} ({sn})" for host, sn in self._found.items()}
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required(CONF_CLU): vol.In(choices)}),
+        )
+
     # async def async_step_entities(self, user_input=None):
     #     """Handle the entity selection."""
     #     if user_input is not None:
@@ -142,6 +205,29 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     #     # Store the entity configurations in the options for the entry
     #     return self.async_create_entry(title="My Smart Home", data=user_input)
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle grenton options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_COMPACT_SNAPSHOT,
+                        default=self.config_entry.options.get(CONF_COMPACT_SNAPSHOT, False),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -2,4 +2,31 @@
 
 DOMAIN = "grenton"
 
-GRENTON_ENTITIES = "entities"
\ No newline at end of file
+GRENTON_ENTITIES = "entities"
+
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN + ".{}.modules"
+
+SIGNAL_MODULES_ADDED = DOMAIN + "_{}_modules_added"
+SIGNAL_MODULE_REMOVED = DOMAIN + "_{}_{}_removed"
+SIGNAL_MODULE_RENAMED = DOMAIN + "_{}_{}_renamed"
+
+# Seconds between cheap project checks, om.lua is only downloaded when they differ
+CONFIG_CHECK_INTERVAL = 300
+
+# checkAlive() interval while the CLU answers, and while it does not
+HEALTH_INTERVAL = 30
+HEALTH_RETRY_INTERVAL = 2
+HEALTH_TIMEOUT = 2
+# Missed checkAlive() replies before the CLU counts as offline
+HEALTH_FAILURES = 2
+
+CONF_COMPACT_SNAPSHOT = 'compact_snapshot'
+
+POLL_INTERVAL = 30
+# Inputs are polled separately so button presses show up quickly. A poll
+# starts every FAST_POLL_INTERVAL seconds, or right after the previous one
+# when it takes longer: each chunk of up to MAX_INPUT_FETCH_ITEMS inputs is
+# one paced command, so beyond about five chunks (a few hundred inputs) the
+# cadence is set by the command interval rather than by this value.
+FAST_POLL_INTERVAL = 0.5
@@ -0,0 +1,131 @@
+"""Shared polling of module values for a single CLU."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DOMAIN
+from .grenton import MAX_FETCH_ITEMS, GrentonClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrentonPoller(DataUpdateCoordinator):
+    """Fetch the values needed by live entities in as few requests as possible.
+
+    Each entity listens with the set of (module id, index) keys it reads as
+    its context. Disabled entities are never added to HA, so they never
+    listen and their values are never requested. In compact mode the values
+    are read through the on-CLU snapshot helper instead of fetchValues.
+
+    With no interval the poller does not schedule itself, async_run()
+    drives it instead.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: GrentonClient,
+        name: str,
+        interval: float | None,
+        compact: bool = False,
+        max_items: int = MAX_FETCH_ITEMS,
+    ) -> None:
+        """Initialize the poller."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} {name}",
+            update_interval=timedelta(seconds=interval) if interval else None,
+        )
+        self.client = client
+        self.snapshot_name = name
+        self.compact = compact
+        self.max_items = max_items
+        # Set by GrentonHealthMonitor
+        self.health = None
+        # Keys whose value differs from the previous poll, None to notify everyone
+        self._changed_keys = None
+        self._stale_keys = set()
+        self._notified_success = None
+
+    async def _async_update_data(self) -> dict:
+        """Fetch all values currently needed."""
+        keys = set()
+        for context in self.async_contexts():
+            keys |= context
+        if not keys:
+            return {}
+        if self.health is not None and not self.health.available:
+            raise UpdateFailed("CLU is offline, polling suspended")
+        try:
+            if self.compact:
+                values = await self.client.fetch_snapshot(self.snapshot_name, keys, self.max_items)
+            else:
+                values = await self.client.fetch_values(keys, self.max_items)
+        except Exception as err:  # pylint: disable=broad-except
+            raise UpdateFailed(f"Error fetching values: {err}") from err
+        if not values:
+            if self.health is not None:
+                self.health.async_check_now()
+            raise UpdateFailed("No response from CLU")
+        if self.health is not None:
+            self.health.async_report_alive()
+        previous = self.data or {}
+        self._changed_keys = {key for key, value in values.items() if previous.get(key) != value}
+        self._changed_keys |= self._stale_keys & values.keys()
+        self._stale_keys.clear()
+        return values
+
+    async def async_run(self, interval: float) -> None:
+        """Refresh at a steady cadence, meant to run as a background task.
+
+        DataUpdateCoordinator schedules the next refresh at a whole second
+        plus jitter, which turns a sub-second interval into bursts of back
+        to back polls. Here each refresh starts `interval` after the previous
+        one started, or as soon as it ends if it took longer, so polls never
+        overlap and never bunch up.
+        """
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            await self.async_refresh()
+            next_run = max(next_run + interval, loop.time())
+            await asyncio.sleep(next_run - loop.time())
+
+    @callback
+    def async_mark_stale(self, keys) -> None:
+        """Report the keys to their entities after the next poll, even if unchanged."""
+        self._stale_keys |= keys
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Call back only the entities whose values changed, in one pass.
+
+        Everyone is called when availability flips, so entities can go
+        unavailable or come back even if their values did not move.
+
+        Relies on DataUpdateCoordinator._listeners mapping each remove callback
+        to (update_callback, context), as in HA 2022.7 and later. Should that
+        private attribute change, everyone is called back as upstream does.
+        """
+        changed = self._changed_keys
+        self._changed_keys = None
+        listeners = getattr(self, '_listeners', None)
+        if (
+            changed is None
+            or self.last_update_success != self._notified_success
+            or not isinstance(listeners, dict)
+        ):
+            self._notified_success = self.last_update_success
+            super().async_update_listeners()
+            return
+        if not changed:
+            return
+        for update_callback, context in list(listeners.values()):
+            if context is None or not context.isdisjoint(changed):
+                update_callback()
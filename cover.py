@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Any
+from homeassistant.core import callback
+from .const import DOMAIN
+from homeassistant.components.cover import ATTR_CURRENT_POSITION, ATTR_POSITION, CoverDeviceClass, CoverEntity, CoverEntityFeature
+from .entity import GrentonEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+GRENTON_SHUTTER_STOPPED = 0
+GRENTON_SHUTTER_OPENING = 1
+GRENTON_SHUTTER_CLOSING = 2
+
+# While a shutter moves after a command it is read this often, seconds
+SHUTTER_FOLLOW_INTERVAL = 1
+# and for at most this long, longer than any full travel
+SHUTTER_FOLLOW_TIMEOUT = 180
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Set up the shutters from a config entry."""
+    _LOGGER.debug("Setting up shutters from config entry")
+
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
+
+    def create_covers(module):
+        # Check if the module is a roller shutter
+        if module['type'] == 'shutter':
+            return [GrentonShutter(hub.poller, module)]
+        return []
+
+    hub.async_add_entities_for(async_add_entities, create_covers)
+
+class GrentonShutter(GrentonEntity, CoverEntity):
+    """Representation of a roller shutter."""
+    _attr_device_class = CoverDeviceClass.SHUTTER
+    _attr_supported_features = (
+        CoverEntityFeature.OPEN
+        | CoverEntityFeature.CLOSE
+        | CoverEntityFeature.STOP
+        | CoverEntityFeature.SET_POSITION
+    )
+
+    def __init__(self, poller, module):
+        """Initialize the shutter."""
+        super().__init__(poller, module)
+        self._attr_unique_id = module['id']
+        self._movement = None
+        self._position = None
+        self._follow_task = None
+
+    @property
+    def current_cover_position(self):
+        """Return the position of the shutter, 0 is closed."""
+        return self._position
+
+    @property
+    def is_closed(self):
+        """Return true if the shutter is closed."""
+        if self._position is None:
+            return None
+        return self._position == 0
+
+    @property
+    def is_opening(self):
+        """Return true if the shutter is moving up."""
+        return self._movement == GRENTON_SHUTTER_OPENING
+
+    @property
+    def is_closing(self):
+        """Return true if the shutter is moving down."""
+        return self._movement == GRENTON_SHUTTER_CLOSING
+
+    async def async_open_cover(self, **kwargs: Any) -> None:
+        """Move the shutter up."""
+        _LOGGER.debug("Opening shutter: %s", self._name)
+        await self._client.move_shutter(self._module['id'], 'up')
+        self._async_follow_movement()
+
+    async def async_close_cover(self, **kwargs: Any) -> None:
+        """Move the shutter down."""
+        _LOGGER.debug("Closing shutter: %s", self._name)
+        await self._client.move_shutter(self._module['id'], 'down')
+        self._async_follow_movement()
+
+    async def async_stop_cover(self, **kwargs: Any) -> None:
+        """Stop the shutter."""
+        _LOGGER.debug("Stopping shutter: %s", self._name)
+        await self._client.move_shutter(self._module['id'], 'stop')
+        self._async_follow_movement()
+
+    async def async_set_cover_position(self, **kwargs: Any) -> None:
+        """Move the shutter to a position."""
+        await self._client.set_shutter_position(self._module['id'], kwargs[ATTR_POSITION])
+        self._async_follow_movement()
+
+    @callback
+    def _async_follow_movement(self) -> None:
+        """Read this shutter until it stops, the shared poll is too slow for travel."""
+        if self._follow_task is not None:
+            self._follow_task.cancel()
+        self._follow_task = self.hass.async_create_background_task(
+            self._async_follow(), f"{self.entity_id} follow movement"
+        )
+
+    async def _async_follow(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SHUTTER_FOLLOW_TIMEOUT
+        while loop.time() < deadline:
+            await asyncio.sleep(SHUTTER_FOLLOW_INTERVAL)
+            values = await self._client.fetch_values(self.coordinator_context)
+            if not values:
+                continue
+            self._async_apply_values(values)
+            if self._movement == GRENTON_SHUTTER_STOPPED:
+                break
+        self._follow_task = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop following the shutter."""
+        if self._follow_task is not None:
+            self._follow_task.cancel()
+        await super().async_will_remove_from_hass()
+
+    def _restore_state(self, last_state):
+        """Show the last known position until the first poll."""
+        if (position := last_state.attributes.get(ATTR_CURRENT_POSITION)) is not None:
+            self._position = position
+
+    def _update_from_state(self, state):
+        """Apply polled state data for the shutter."""
+        if state['state'] is not None:
+            self._movement = state['state']
+        if state['position'] is not None:
+            self._position = state['position']
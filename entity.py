@@ -0,0 +1,141 @@
+"""Base entity for grenton modules."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import SIGNAL_MODULE_REMOVED, SIGNAL_MODULE_RENAMED
+from .grenton import attribute_fields, decode_fields
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrentonEntity(CoordinatorEntity, RestoreEntity):
+    """Common parts of all entities backed by a CLU module.
+
+    `attributes` names the schema attributes the entity reads, all of the
+    module's attributes when None. The poller only calls back when one of
+    them changed, and the state is only written when the typed values or
+    the availability differ from what was last written.
+
+    Until the first poll arrives the entity shows its last known state and
+    a `restored` attribute, so entities created from the cached module list
+    are not unknown on startup.
+    """
+    _attr_has_entity_name = True
+
+    def __init__(self, poller, module, attributes=None):
+        """Initialize the entity."""
+        self._fields = attribute_fields(module, attributes)
+        super().__init__(poller, context=frozenset(key for _, key, _ in self._fields))
+        self._client = poller.client
+        self._module = module
+        self._name = self._build_name(module)
+        self._last_state = None
+        self._last_available = None
+        self._restored = False
+
+    def _build_name(self, module):
+        """Return the entity name for a module."""
+        return module['name']
+
+    @property
+    def name(self):
+        """Return the name of the entity."""
+        return self._name
+
+    @property
+    def extra_state_attributes(self):
+        """Flag a state restored from before the restart."""
+        if self._restored:
+            return {'restored': True}
+        return None
+
+    def _update_from_state(self, state):
+        """Apply freshly polled, typed attribute values."""
+        raise NotImplementedError
+
+    def _restore_state(self, last_state):
+        """Apply the state HA saved before the restart."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Pick this entity's values out of the shared poll, write only on change."""
+        available = self.coordinator.last_update_success
+        state = decode_fields(self._fields, self.coordinator.data) if self.coordinator.data else None
+        if state == self._last_state and available == self._last_available:
+            return
+        if state is not None and state != self._last_state:
+            self._update_from_state(state)
+            self._last_state = state
+            self._restored = False
+        self._last_available = available
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Start polling and follow the module when the project on the CLU changes."""
+        await super().async_added_to_hass()
+        entry_id = self.platform.config_entry.entry_id
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_MODULE_REMOVED.format(entry_id, self._module['id']), self._async_module_removed
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_MODULE_RENAMED.format(entry_id, self._module['id']), self._async_module_renamed
+            )
+        )
+        # Values already polled for other entities are only reported again if they
+        # change, apply them silently and let the platform write the first state
+        if self.coordinator.data and not self.coordinator_context.isdisjoint(self.coordinator.data):
+            self._last_state = decode_fields(self._fields, self.coordinator.data)
+            self._last_available = self.coordinator.last_update_success
+            self._update_from_state(self._last_state)
+        elif (last_state := await self.async_get_last_state()) is not None:
+            self._restore_state(last_state)
+            self._restored = True
+        # Debounced, so a batch of new entities shares one fetch; startup does not wait for it
+        self.hass.async_create_background_task(
+            self.coordinator.async_request_refresh(), f"{self.entity_id} first refresh"
+        )
+
+    @callback
+    def _async_apply_values(self, values) -> None:
+        """Apply values read for this entity alone, outside the shared poll."""
+        state = decode_fields(self._fields, values)
+        if state == self._last_state:
+            return
+        self._update_from_state(state)
+        self._last_state = state
+        self._restored = False
+        self.async_write_ha_state()
+
+    @callback
+    def _async_write_optimistic(self) -> None:
+        """Write a state set by a command, the next poll is compared against it."""
+        self._last_state = None
+        self.coordinator.async_mark_stale(self.coordinator_context)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_module_removed(self) -> None:
+        """Drop the entity, the module is gone from the project."""
+        _LOGGER.debug("Removing %s, module no longer in project", self.entity_id)
+        registry = er.async_get(self.hass)
+        if registry.async_get(self.entity_id):
+            registry.async_remove(self.entity_id)
+        else:
+            self.hass.async_create_task(self.async_remove(force_remove=True))
+
+    @callback
+    def _async_module_renamed(self, module) -> None:
+        """Pick up the new module name."""
+        self._module = module
+        self._name = self._build_name(module)
+        self.async_write_ha_state()
@@ -4,12 +4,12 @@ from binascii import unhexlify
 import xml.etree.ElementTree as ET
 import re
 import json
+import hashlib
+import ipaddress
 
 import asyncio
 import struct
 
-from datetime import datetime, timedelta
-
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 from base64 import b64encode, b64decode
@@ -20,6 +20,9 @@ RRQ_OPCODE = 1
 DATA_OPCODE = 3
 ACK_OPCODE = 4
 ERROR_OPCODE = 5
+OACK_OPCODE = 6
+# TFTP error sent to stop a transfer after reading the option ack
+OPTION_DENIED = 8
 
 OBJECT_TYPES = {
     0: 'clu',
@@ -41,15 +44,94 @@ OBJECT_TYPES = {
     39: 'sun_clock'
 }
 
+# Minimum seconds between two commands sent to the CLU, by any caller
 TIMEDELTA = 0.1
-
-RGBW_CHANNEL_GET = {
-    'r': 3,
-    'g': 4,
-    'b': 5,
-    'w': 15,
+# Commands waiting for a reply at any time, and of those, the chunks of one read
+MAX_IN_FLIGHT = 4
+MAX_READ_IN_FLIGHT = 2
+
+OM_LUA_PATH = r'a:\om.lua'
+CONFIG_JSON_PATH = r'a:\CONFIG.JSON'
+
+# Readable attributes per object type: name -> (fetchValues index, value type)
+OBJECT_ATTRIBUTES = {
+    'd_in': {
+        'state': (0, int),
+    },
+    'd_out': {
+        'state': (0, int),
+    },
+    'touch_btn': {
+        'state': (0, int),
+    },
+    'psuvoltage': {
+        'value': (0, float),
+    },
+    'a_out': {
+        'value': (0, float),
+    },
+    'shutter': {
+        'state': (0, int),
+        'position': (7, int),
+    },
+    'led': {
+        'r': (3, int),
+        'g': (4, int),
+        'b': (5, int),
+        'w': (15, int),
+    },
+    'thermostat': {
+        'currentTemp': (14, float),
+        'controlOut': (13, int),
+        'setTemp': (3, float),
+        'on': (6, int),
+        'mode': (8, int),
+        'targetTemp': (12, float),
+    },
+    'touch_senstemp': {
+        'value': (0, float),
+    },
+    'touch_senslight': {
+        'value': (0, float),
+    },
+    '1w_temp': {
+        'value': (0, float),
+    },
 }
 
+# Keep each fetchValues reply well inside a single datagram
+MAX_FETCH_ITEMS = 40
+# Inputs read as single digits, so many more fit in one reply
+MAX_INPUT_FETCH_ITEMS = 100
+# Longest request text: once encrypted and padded it still fits one
+# unfragmented UDP datagram (1472 bytes on Ethernet)
+MAX_REQUEST_LENGTH = 1024
+# 'req:' + address + ':' + id + ':' and the Lua wrapped around the items
+REQUEST_OVERHEAD = 160
+
+# Compact snapshots: a Lua helper kept on the CLU reads a registered list of
+# values and replies with 'seq|F|v;v;...' (full) or 'seq|D|slot=v;...' (only
+# the slots changed since the previous call). Several named lists can coexist.
+# A full reply carries every value, so a snapshot is split into segments of
+# no more keys than one fetchValues chunk, each read with its own call.
+# Install replies are just a count, so MAX_REQUEST_LENGTH is what limits a chunk.
+SNAPSHOT_INSTALL_ITEMS = 100
+SNAPSHOT_RESET = "(function() HA_SN=HA_SN or {{}} HA_SN['{name}']={{k={{}},v={{}},s=0}} return 1 end)()"
+SNAPSHOT_APPEND = (
+    "(function() local k=HA_SN['{name}'].k "
+    "for _,e in ipairs({{{items}}}) do k[#k+1]=e end return #k end)()"
+)
+SNAPSHOT_FUNCTION = (
+    "(function() HA_SNAP=function(n,s) local t=HA_SN[n] local k,v,o,f=t.k,t.v,{},(s~=t.s) "
+    "for i=1,#k do local x=tostring(k[i][1]:get(k[i][2])) "
+    "if f then o[i]=x elseif x~=v[i] then o[#o+1]=i..'='..x end v[i]=x end "
+    "t.s=t.s+1 return t.s..(f and '|F|' or '|D|')..table.concat(o,';') end return 1 end)()"
+)
+SNAPSHOT_CALL = "HA_SNAP('{name}',{seq})"
+SNAPSHOT_REPLY = re.compile(r'^"?(\d+)\|([FD])\|(.*?)"?$', re.S)
+
+RGBW_CHANNEL_GET = {name: index for name, (index, _) in OBJECT_ATTRIBUTES['led'].items()}
+
 RGBW_CHANNEL_EXECUTE = {
     'r': 3,
     'g': 4,
@@ -57,25 +139,283 @@ RGBW_CHANNEL_EXECUTE = {
     'w': 12,
 }
 
-THERMO_VALUES_GET = {
-    'currentTemp': 14,
-    'controlOut': 13,
-    'setTemp': 3,
-    'on': 6,
-    'mode': 8,
-    'targetTemp': 12
+THERMO_VALUES_GET = {name: index for name, (index, _) in OBJECT_ATTRIBUTES['thermostat'].items()}
+
+SHUTTER_EXECUTE = {
+    'up': 0,
+    'down': 1,
+    'stop': 3,
+    'position': 10,
 }
 
+
+def attribute_keys(module, names=None):
+    """Return the (module id, index) keys for some or all attributes of a module."""
+    schema = OBJECT_ATTRIBUTES[module['type']]
+    if names is None:
+        names = schema
+    return {(module['id'], schema[name][0]) for name in names}
+
+
+def attribute_fields(module, names=None):
+    """Return (name, key, type) for some or all attributes of a module.
+
+    Worked out once per entity so decoding a poll is a plain loop.
+    """
+    schema = OBJECT_ATTRIBUTES[module['type']]
+    if names is None:
+        names = schema
+    return tuple((name, (module['id'], schema[name][0]), schema[name][1]) for name in names)
+
+
+def decode_fields(fields, values):
+    """Turn raw fetched values into typed attributes.
+
+    Attributes that were not fetched or cannot be converted come back as None.
+    """
+    state = {}
+    for name, key, kind in fields:
+        raw = values.get(key)
+        try:
+            state[name] = kind(float(raw)) if kind is int else kind(raw)
+        except (TypeError, ValueError):
+            state[name] = None
+    return state
+
+
+def decode_attributes(module, values, names=None):
+    """Turn raw fetched values into typed attributes of a module."""
+    return decode_fields(attribute_fields(module, names), values)
+
+
+def chunk_keys(keys, max_items):
+    """Split keys into runs of at most `max_items` that fit one request.
+
+    Returns (keys, Lua items) pairs, the items already formatted as {id,index}.
+    """
+    budget = MAX_REQUEST_LENGTH - REQUEST_OVERHEAD
+    chunks = []
+    chunk, items, length = [], [], 0
+    for module_id, index in keys:
+        item = f'{{{module_id},{index}}}'
+        if chunk and (len(chunk) >= max_items or length + 1 + len(item) > budget):
+            chunks.append((chunk, ','.join(items)))
+            chunk, items, length = [], [], 0
+        length += len(item) + (1 if items else 0)
+        chunk.append((module_id, index))
+        items.append(item)
+    if chunk:
+        chunks.append((chunk, ','.join(items)))
+    return chunks
+
+
+def plan_fetch(keys, max_items=MAX_FETCH_ITEMS):
+    """Group (module id, index) keys into as few fetchValues commands as possible.
+
+    Duplicates are dropped and the order is stable so the CLU sees the same
+    requests every cycle. Returns a list of (command, keys) pairs.
+    """
+    return [
+        (f'SYSTEM:fetchValues({{{items}}})', chunk)
+        for chunk, items in chunk_keys(sorted(set(keys)), max_items)
+    ]
+
+
+def plan_snapshot_install(name, keys):
+    """Return the commands that register `keys`, in order, as snapshot `name` on the CLU."""
+    commands = [SNAPSHOT_RESET.format(name=name)]
+    for _, items in chunk_keys(keys, SNAPSHOT_INSTALL_ITEMS):
+        commands.append(SNAPSHOT_APPEND.format(name=name, items=items))
+    commands.append(SNAPSHOT_FUNCTION)
+    return commands
+
+
+def plan_snapshot_segments(name, keys, max_items=MAX_FETCH_ITEMS):
+    """Split snapshot `name` into (segment name, keys) of at most `max_items` keys.
+
+    A full reply of a segment is no longer than a fetchValues reply of the
+    same keys, so it fits one datagram. The keys are sorted so segments stay
+    the same between polls.
+    """
+    keys = sorted(set(keys))
+    return [
+        (f'{name}_{number}', keys[start:start + max_items])
+        for number, start in enumerate(range(0, len(keys), max_items))
+    ]
+
+
+def decode_snapshot(reply, values):
+    """Decode a snapshot reply into the `values` list, indexed by slot.
+
+    Returns the sequence number, or None if the reply is not a snapshot
+    (helper missing, CLU rebooted) or a full reply has the wrong length.
+    """
+    match = SNAPSHOT_REPLY.match(reply)
+    if not match:
+        return None
+    seq, kind, payload = match.groups()
+    if kind == 'F':
+        items = payload.split(';') if values else []
+        if len(items) != len(values):
+            return None
+        values[:] = items
+    elif payload:
+        for item in payload.split(';'):
+            slot, _, value = item.partition('=')
+            values[int(slot) - 1] = value
+    return int(seq)
+
+
+def parse_modules(om_lua):
+    """Return the modules declared in the text of om.lua."""
+    conf = iter(om_lua.splitlines())
+
+    modules = []
+    for row in conf:
+        mod = {}
+        if ' = OBJECT:new(' in row and '--' not in row:
+            comment = next(conf)
+            if '-- NAME' in comment:
+                args = re.findall(r'\((.*?)\)', row)[0].split(', ')
+                name, module_id = re.search(r'(?:NAME_IO |NAME_PERIPHERY |NAME_CLU )(.*)', comment).group(1).split('=')
+                mod['name'] = name
+                mod['id'] = module_id
+                mod['type'] = OBJECT_TYPES[int(args[0])]
+                modules.append(mod)
+    return modules
+
+
+def diff_modules(old, new):
+    """Compare two module lists by id.
+
+    Returns the added modules, the removed modules and the modules whose
+    name or type changed, each as a list of module dicts from the new list
+    (or the old one for removals).
+    """
+    old_by_id = {mod['id']: mod for mod in old}
+    new_by_id = {mod['id']: mod for mod in new}
+    added = [mod for mod_id, mod in new_by_id.items() if mod_id not in old_by_id]
+    removed = [mod for mod_id, mod in old_by_id.items() if mod_id not in new_by_id]
+    changed = [
+        mod for mod_id, mod in new_by_id.items()
+        if mod_id in old_by_id and mod != old_by_id[mod_id]
+    ]
+    return added, removed, changed
+
+
+def parse_oack(packet):
+    """Return the options of a TFTP option acknowledgement (RFC 2347) as a dict."""
+    fields = packet[2:].split(b'\0')
+    return {
+        name.decode().lower(): value.decode()
+        for name, value in zip(fields[0::2], fields[1::2])
+        if name
+    }
+
+
+def detect_source_ip(host, port=1234):
+    """Return the local address the OS would use to reach the host.
+
+    Connecting a UDP socket only selects a route, nothing is sent. Pass
+    an IP address, a hostname would be resolved here with a blocking lookup.
+    """
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.connect((host, port))
+        return probe.getsockname()[0]
+    except OSError as err:
+        raise OSError(f'Cannot find a local address routed to {host}: {err}') from err
+    finally:
+        probe.close()
+
+
+class _GrentonProtocol(asyncio.DatagramProtocol):
+    """Hand datagrams from the CLU back to the client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, addr):
+        self.client._handle_datagram(data)
+
+    def error_received(self, exc):
+        if self.client.DEBUG:
+            print(f'Socket error: {exc}')
+
+    def connection_lost(self, exc):
+        self.client._transport = None
+
+
+class _ScanProtocol(asyncio.DatagramProtocol):
+    """Collect probe replies by sender address."""
+
+    def __init__(self):
+        self.waiters = {}
+
+    def datagram_received(self, data, addr):
+        future = self.waiters.get(addr[0])
+        if future is not None and not future.done():
+            future.set_result(data)
+
+
+async def discover_clus(base64_key, base64_iv, network=None, port=1234, concurrency=64, timeout=1.0):
+    """Find CLUs on a subnet that answer an encrypted checkAlive().
+
+    All probes share one socket and at most `concurrency` are in flight at
+    a time. Only hosts whose reply decrypts with the given key count, so
+    this also confirms the key. Returns a list of {'host', 'alive'} dicts.
+    """
+    if network is None:
+        # The /24 of the interface on the default route
+        network = f"{detect_source_ip('192.0.2.1', port)}/24"
+    hosts = [str(host) for host in ipaddress.ip_network(network, strict=False).hosts()]
+    if not hosts:
+        return []
+    source_ip = detect_source_ip(hosts[0], port)
+
+    prober = GrentonClient(hosts[0], udp_port=port, base64_key=base64_key, base64_iv=base64_iv, source_ip=source_ip)
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_ScanProtocol, local_addr=('0.0.0.0', 0))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host):
+        async with semaphore:
+            cmd_id = prober.id_gen()
+            future = loop.create_future()
+            protocol.waiters[host] = future
+            try:
+                transport.sendto(prober.encrypt(f'req:{source_ip}:{cmd_id}:checkAlive()'), (host, port))
+                data = await asyncio.wait_for(future, timeout)
+                response = prober.decrypt(data)
+            except (asyncio.TimeoutError, OSError, ValueError, UnicodeDecodeError):
+                return None
+            finally:
+                protocol.waiters.pop(host, None)
+            match = re.search(rf'{cmd_id}:(.*)', response)
+            if not match:
+                return None
+            return {'host': host, 'alive': match.group(1)}
+
+    try:
+        results = await asyncio.gather(*(probe(host) for host in hosts))
+    finally:
+        transport.close()
+    return [result for result in results if result]
+
+
 class GrentonClient():
     key = None
     iv = None
     cipher = None
     clu_config = None
 
-    def __init__(self, host,udp_port=1234, base64_key=None, base64_iv=None, debug=False):
+    def __init__(self, host,udp_port=1234, base64_key=None, base64_iv=None, debug=False, source_ip=None, local_port=0, command_interval=TIMEDELTA, max_in_flight=MAX_IN_FLIGHT):
         self.host = host
         self.port = udp_port
-        self.source_ip = '192.168.1.1'
+        # Taken from the session socket in connect() unless given
+        self.source_ip = source_ip
+        self.local_port = local_port
+        self.command_interval = command_interval
         if base64_key:
             self.key = b64decode(base64_key)
         if base64_iv:
@@ -84,19 +424,29 @@ class GrentonClient():
         if self.key and self.iv:
             self.cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.settimeout(5)
+        # One socket for the lifetime of the client, opened on first use
+        self._transport = None
+        self._connect_lock = asyncio.Lock()
+        self._pending = {}
+        self._message_waiter = None
+        self._tftp_lock = asyncio.Lock()
+        self._snapshots = {}
+        # Pacing shared by the pollers, the health probe and user commands
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._gap_lock = asyncio.Lock()
+        self._last_send = None
 
         self.objects = []
-
-        self.last_command_time = datetime.now()
         return None
 
     def __str__(self):
         return 'Hi'
 
     def id_gen(self):
-        return os.urandom(3).hex()
+        while True:
+            cmd_id = os.urandom(3).hex()
+            if cmd_id not in self._pending:
+                return cmd_id
 
     def load_keys(self, path):
         xml = ET.parse(path).getroot()
@@ -108,46 +458,111 @@ class GrentonClient():
         self.key = b64decode(base64_key)
         self.iv = b64decode(base64_iv)
 
-    def send_message(self, message):
-        if self.DEBUG:
-            print(f'Sending message: {message}')
-        self.sock.sendto(self.encrypt(message), (self.host, self.port))
-        response = None
-        try:
-            resp, addr = self.sock.recvfrom(1024)
-            response = self.decrypt(resp)
+    async def connect(self):
+        """Bind the local port and open the session with the CLU."""
+        async with self._connect_lock:
+            if self._transport is not None:
+                return
+            loop = asyncio.get_running_loop()
+            # A connected socket only accepts datagrams from the CLU itself.
+            # The host is resolved by the loop without blocking, and once
+            # connected the socket reports the local address routed to it.
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _GrentonProtocol(self),
+                local_addr=(self.source_ip or '0.0.0.0', self.local_port),
+                remote_addr=(self.host, self.port),
+            )
+            self.source_ip, self.local_port = self._transport.get_extra_info('sockname')[:2]
             if self.DEBUG:
-                print(f'Received response: {response}')
-        except socket.timeout:
-            print("Timeout: No response received.")
-            return False
-        return response
-
-    async def send_command(self, commad):
-        nowtime = datetime.now()
-        if (nowtime - self.last_command_time) < timedelta(seconds=TIMEDELTA):
-            await asyncio.sleep(TIMEDELTA)
-            # Actually use Threading timer here
-        self.last_command_time = datetime.now()
-        cmd_id = self.id_gen()
-        msg = 'req:' + self.source_ip + f':{cmd_id}:{commad}'
-        if self.DEBUG:
-            print(f'Sending command: {msg}')
-        self.sock.sendto(self.encrypt(msg), (self.host, self.port))
+                print(f'Session open from {self.source_ip}:{self.local_port}')
+
+    def close(self):
+        """Close the session and fail anything still waiting for a reply."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        if self._message_waiter is not None and not self._message_waiter.done():
+            self._message_waiter.cancel()
+        self._message_waiter = None
+
+    def _handle_datagram(self, data):
         try:
-            resp, addr = self.sock.recvfrom(1024)
-            response = self.decrypt(resp)
-            if self.DEBUG:
-                print(f'Received response: {response}')
-            match = re.search(rf'{cmd_id}:(.*)', response)
-            if match:
-                return match.group(1)
+            response = self.decrypt(data)
+        except (ValueError, UnicodeDecodeError):
             if self.DEBUG:
+                print('Could not decrypt datagram, ignoring')
+            return
+        if self.DEBUG:
+            print(f'Received response: {response}')
+        match = re.match(r'resp:[^:]*:([0-9a-f]{6}):(.*)', response, re.S)
+        if match:
+            future = self._pending.pop(match.group(1), None)
+            if future is not None and not future.done():
+                future.set_result(match.group(2))
+            elif self.DEBUG:
                 print('Not found the command id, received wrong packet?')
-            return False
-        except socket.timeout:
+            return
+        if self._message_waiter is not None and not self._message_waiter.done():
+            self._message_waiter.set_result(response)
+
+    async def _send(self, payload):
+        if self._transport is None:
+            await self.connect()
+        self._transport.sendto(self.encrypt(payload))
+
+    async def send_message(self, message, timeout=5):
+        if self.DEBUG:
+            print(f'Sending message: {message}')
+        self._message_waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._send(message)
+            return await asyncio.wait_for(self._message_waiter, timeout)
+        except asyncio.TimeoutError:
             print("Timeout: No response received.")
             return False
+        finally:
+            self._message_waiter = None
+
+    async def _wait_command_gap(self):
+        """Wait until command_interval has passed since the previous send.
+
+        Callers queue on the lock, so concurrent commands go out one
+        interval apart instead of all at once after the same sleep.
+        """
+        async with self._gap_lock:
+            loop = asyncio.get_running_loop()
+            if self._last_send is not None:
+                wait = self._last_send + self.command_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._last_send = loop.time()
+
+    async def send_command(self, commad, timeout=5):
+        # A slot is held until the reply arrives, so at most max_in_flight
+        # commands are outstanding whatever the number of callers
+        async with self._in_flight:
+            await self._wait_command_gap()
+            if self._transport is None:
+                # The req: header needs the source address found on connect
+                await self.connect()
+            cmd_id = self.id_gen()
+            msg = 'req:' + self.source_ip + f':{cmd_id}:{commad}'
+            if self.DEBUG:
+                print(f'Sending command: {msg}')
+            future = asyncio.get_running_loop().create_future()
+            self._pending[cmd_id] = future
+            try:
+                await self._send(msg)
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                print("Timeout: No response received.")
+                return False
+            finally:
+                self._pending.pop(cmd_id, None)
 
     def encrypt(self, string):
         cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
@@ -158,38 +573,141 @@ class GrentonClient():
         cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
         return unpad(cipher.decrypt(data), AES.block_size).decode()
 
-    async def ping(self):
-        return await self.send_command('checkAlive()')
+    async def ping(self, timeout=5):
+        return await self.send_command('checkAlive()', timeout)
 
     async def list_modules(self):
-        conf = await self.fetch_file_from_tftp('a:\om.lua')
-        conf = iter(conf.decode().splitlines())
-
-        modules = []
-        for row in conf:
-            mod = {}
-            if ' = OBJECT:new(' in row and '--' not in row:
-                comment = next(conf)
-                if '-- NAME' in comment:
-                    args = re.findall(r'\((.*?)\)', row)[0].split(', ')
-                    name, module_id = re.search(r'(?:NAME_IO |NAME_PERIPHERY |NAME_CLU )(.*)', comment).group(1).split('=')
-                    mod['name'] = name
-                    mod['id'] = module_id
-                    mod['type'] = OBJECT_TYPES[int(args[0])]
-                    modules.append(mod)
+        _, modules = await self.read_project()
+        return modules
+
+    async def read_project(self, known_fingerprint=None):
+        """Download om.lua and return (fingerprint, modules).
+
+        The fingerprint is a hash of the whole file. When it equals
+        `known_fingerprint` the parse is skipped and modules is None.
+        Returns (None, None) if the file could not be read.
+        """
+        conf = await self.fetch_file_from_tftp(OM_LUA_PATH)
+        if not conf:
+            return None, None
+        fingerprint = hashlib.sha1(conf).hexdigest()
+        if fingerprint == known_fingerprint:
+            return fingerprint, None
+        modules = parse_modules(conf.decode())
         if self.DEBUG:
             print(modules)
         self.objects = modules
-        return modules
+        return fingerprint, modules
+
+    async def read_project_stamp(self):
+        """Return a cheap stamp of the project on the CLU, None if it cannot be read.
+
+        It hashes CONFIG.JSON, a single TFTP block, together with the size of
+        om.lua taken from the tsize option (RFC 2349), so om.lua itself is not
+        transferred. A rename that keeps the file size and CONFIG.JSON the same
+        goes unnoticed, the full om.lua hash of read_project() catches it.
+        """
+        config = await self.fetch_file_from_tftp(CONFIG_JSON_PATH)
+        if not config:
+            return None
+        size = await self._run_tftp(self._fetch_tftp_size, OM_LUA_PATH)
+        return hashlib.sha1(config + f'|{size or None}'.encode()).hexdigest()
 
     async def get_clu_id(self):
-        conf = await self.fetch_file_from_tftp('a:\CONFIG.JSON')
+        conf = await self.fetch_file_from_tftp(CONFIG_JSON_PATH)
+        if not conf:
+            return None
         return json.loads(conf.decode())['sn']
 
+    async def fetch_values(self, keys, max_items=MAX_FETCH_ITEMS):
+        """Read many (module id, index) values, returns raw strings keyed the same way.
+
+        Chunks are paced like any other command, but up to MAX_READ_IN_FLIGHT
+        of them wait for their replies at the same time, matched by command
+        id. A slow reply then does not hold back the next chunk, and a large
+        read still leaves room for other callers.
+        """
+        plan = plan_fetch(keys, max_items)
+        read_slots = asyncio.Semaphore(MAX_READ_IN_FLIGHT)
+
+        async def fetch(command):
+            async with read_slots:
+                return await self.send_command(command)
+
+        responses = await asyncio.gather(*(fetch(command) for command, _ in plan))
+        values = {}
+        for (_, chunk), response in zip(plan, responses):
+            if not response:
+                continue
+            match = re.search(r'\{([^{}]*)\}', response)
+            if not match:
+                continue
+            values.update(zip(chunk, match.group(1).split(',')))
+        return values
+
+    async def install_snapshot(self, name, keys):
+        """Register the keys of snapshot `name` on the CLU."""
+        keys = sorted(set(keys))
+        for command in plan_snapshot_install(name, keys):
+            if not await self.send_command(command):
+                self._snapshots.pop(name, None)
+                return False
+        # Preallocated once, snapshot replies are decoded into it in place
+        self._snapshots[name] = {'keys': keys, 'values': [None] * len(keys), 'seq': -1}
+        return True
+
+    async def fetch_snapshot(self, name, keys, max_items=MAX_FETCH_ITEMS):
+        """Read values through the on-CLU snapshot helper.
+
+        Same result as fetch_values(), but usually one short packet per
+        segment of `max_items` keys. Segments are read like fetch chunks,
+        at most MAX_READ_IN_FLIGHT at a time.
+        """
+        read_slots = asyncio.Semaphore(MAX_READ_IN_FLIGHT)
+
+        async def fetch(segment, segment_keys):
+            async with read_slots:
+                return await self._fetch_snapshot_segment(segment, segment_keys)
+
+        results = await asyncio.gather(
+            *(fetch(segment, segment_keys) for segment, segment_keys in plan_snapshot_segments(name, keys, max_items))
+        )
+        values = {}
+        for result in results:
+            values.update(result)
+        return values
+
+    async def _fetch_snapshot_segment(self, name, keys):
+        """Read one snapshot segment.
+
+        The helper is (re)installed whenever the keys change or the CLU
+        no longer knows it, e.g. after a reboot.
+        """
+        snapshot = self._snapshots.get(name)
+        if snapshot is None or snapshot['keys'] != sorted(set(keys)):
+            if not await self.install_snapshot(name, keys):
+                return {}
+            snapshot = self._snapshots[name]
+        for attempt in range(2):
+            response = await self.send_command(SNAPSHOT_CALL.format(name=name, seq=snapshot['seq']))
+            if not response:
+                return {}
+            seq = decode_snapshot(response, snapshot['values'])
+            if seq is not None:
+                snapshot['seq'] = seq
+                return dict(zip(snapshot['keys'], snapshot['values']))
+            if attempt or not await self.install_snapshot(name, keys):
+                return {}
+            snapshot = self._snapshots[name]
+        return {}
+
+    async def get_module_state(self, module, names=None):
+        values = await self.fetch_values(attribute_keys(module, names))
+        return decode_attributes(module, values, names)
+
     async def get_switch_state(self, module_id):
-        response = await self.send_command('SYSTEM:fetchValues({{' + module_id + ',0}})')
-        state = re.search(r'\{([^{}]*)\}', response).group(1)
-        return state == '1'
+        state = await self.get_module_state({'id': module_id, 'type': 'd_out'})
+        return state['state'] == 1
 
     async def set_switch_state(self, module_id, state):
         response = await self.send_command(f'{module_id}:set(0, {int(state)})')
@@ -197,28 +715,14 @@ class GrentonClient():
             return True
         return False
 
-    async def get_sensor_value(self, module_id):
-        response = await self.send_command('SYSTEM:fetchValues({{' + module_id + ',0}})')
-        return re.search(r'\{([^{}]*)\}', response).group(1)
+    async def get_sensor_value(self, module_id, module_type='1w_temp'):
+        state = await self.get_module_state({'id': module_id, 'type': module_type})
+        return state['value']
 
     async def get_led_state(self, module_id, channel):
-        msg = "SYSTEM:fetchValues({"
-        for i in RGBW_CHANNEL_GET.values():
-            msg += f"{{{module_id},{i}}}"
-            if i < 15:
-                msg += ","
-        msg += "})"
-        response = await self.send_command(msg)
-        response = re.search(r'\{([^{}]*)\}', response).group(1).split(',')
-        state = {
-            'r': response[0],
-            'g': response[1],
-            'b': response[2],
-            'w': response[3],
-            }
+        state = await self.get_module_state({'id': module_id, 'type': 'led'}, [channel])
         return state[channel]
 
-
     async def set_led_value(self, module_id, channel, value, ramp_ms=2000):
         msg = f'{module_id}:execute({RGBW_CHANNEL_EXECUTE[channel]},{value},{ramp_ms})'
         response = await self.send_command(msg)
@@ -233,24 +737,21 @@ class GrentonClient():
             return True
         return False
 
+    async def execute_module(self, module_id, method, *args):
+        params = ','.join(str(arg) for arg in (method, *args))
+        response = await self.send_command(f'{module_id}:execute({params})')
+        if response == 'nil':
+            return True
+        return False
+
+    async def move_shutter(self, module_id, direction):
+        return await self.execute_module(module_id, SHUTTER_EXECUTE[direction], 0)
+
+    async def set_shutter_position(self, module_id, position):
+        return await self.execute_module(module_id, SHUTTER_EXECUTE['position'], int(position))
+
     async def get_thermo_values(self, module_id):
-        msg = "SYSTEM:fetchValues({"
-        for i in THERMO_VALUES_GET.values():
-            msg += f"{{{module_id},{i}}}"
-            if i < 15:
-                msg += ","
-        msg += "})"
-        response = await self.send_command(msg)
-        response = re.search(r'\{([^{}]*)\}', response).group(1).split(',')
-        state = {
-            'currentTemp': float(response[0]),
-            'controlOut': int(response[1]),
-            'setTemp': float(response[2]),
-            'on': int(response[3]),
-            'mode': int(response[4]),
-            'targetTemp': float(response[5])
-        }
-        return state
+        return await self.get_module_state({'id': module_id, 'type': 'thermostat'})
 
     async def set_thermo_away_mode(self, module_id, state):
         command = 6
@@ -262,16 +763,59 @@ class GrentonClient():
         return False
 
     async def fetch_file_from_tftp(self, filename):
-        # Start TFTP server on the CLU
-        resp = self.send_message('req_start_ftp')
-        if resp != 'resp:OK':
-            return False
-
-        # Set up the socket
+        return await self._run_tftp(self._fetch_file_from_tftp, filename)
+
+    async def _run_tftp(self, transfer, filename):
+        # The TFTP port is fixed, so only one transfer can run at a time
+        async with self._tftp_lock:
+            # Start TFTP server on the CLU. The handshake goes through the
+            # session like every other request, only the transfer on its own
+            # socket runs in the executor.
+            resp = await self.send_message('req_start_ftp')
+            if resp != 'resp:OK':
+                return False
+
+            # Run the blocking transfer off the event loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, transfer, filename)
+
+    def _open_tftp_socket(self):
         tftp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         tftp.bind(('0.0.0.0', 5683))
         tftp.settimeout(5)
+        return tftp
+
+    def _fetch_tftp_size(self, filename):
+        """Ask for the size of a file with the tsize option, without reading it.
+
+        Returns None if the server does not support options.
+        """
+        tftp = self._open_tftp_socket()
+        try:
+            packet = struct.pack('!H', RRQ_OPCODE) + filename.encode() + b'\0' + b'netascii\0' + b'tsize\0' + b'0\0'
+            tftp.sendto(packet, (self.host, 69))
+            response, addr = tftp.recvfrom(516)
+            opcode = struct.unpack('!H', response[:2])[0]
+            size = None
+            if opcode == OACK_OPCODE:
+                size = parse_oack(response).get('tsize')
+            if opcode in (OACK_OPCODE, DATA_OPCODE):
+                # Stop the server, the file itself is not wanted
+                tftp.sendto(struct.pack('!HH', ERROR_OPCODE, OPTION_DENIED) + b'\0', addr)
+            return int(size) if size is not None else None
+        except (OSError, ValueError):
+            return None
+        finally:
+            tftp.close()
+
+    def _fetch_file_from_tftp(self, filename):
+        tftp = self._open_tftp_socket()
+        try:
+            return self._receive_tftp_file(tftp, filename)
+        finally:
+            tftp.close()
 
+    def _receive_tftp_file(self, tftp, filename):
         # Send the RRQ packet to the server
         packet = struct.pack('!H', RRQ_OPCODE) + filename.encode() + b'\0' + b'netascii\0'
         tftp.sendto(packet, (self.host, 69))
@@ -300,5 +844,4 @@ class GrentonClient():
             else:
                 print("Unexpected opcode received.")
                 break
-        tftp.close()
         return file_data
\ No newline at end of file
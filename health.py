@@ -0,0 +1,102 @@
+"""Reachability tracking for a single CLU."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+from homeassistant.core import callback
+
+from .const import HEALTH_FAILURES, HEALTH_INTERVAL, HEALTH_RETRY_INTERVAL, HEALTH_TIMEOUT
+from .grenton import GrentonClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrentonHealthMonitor:
+    """Probe the CLU with checkAlive() and gate the pollers on the result.
+
+    The CLU is probed every HEALTH_INTERVAL seconds while it answers and every
+    HEALTH_RETRY_INTERVAL seconds once a probe was missed, so a reboot (for
+    example after a project upload) is noticed quickly and so is the return.
+    While offline the pollers are suspended. On return the pollers refresh
+    right away and then `on_recovered` is called once, it must not block.
+    """
+
+    def __init__(
+        self, client: GrentonClient, pollers: list, on_recovered: Callable[[], None]
+    ) -> None:
+        """Initialize the monitor."""
+        self.client = client
+        self.pollers = pollers
+        self.available = True
+        self.failures = 0
+        self.rtt: float | None = None
+        self.last_seen: float | None = None
+        self._poll_ok_at: float | None = None
+        self._on_recovered = on_recovered
+        self._wake = asyncio.Event()
+        for poller in pollers:
+            poller.health = self
+
+    async def async_run(self) -> None:
+        """Probe forever, meant to run as a background task."""
+        while True:
+            # Cleared before probing, so a check asked for meanwhile is not lost
+            self._wake.clear()
+            await self._async_probe()
+            interval = HEALTH_INTERVAL if not self.failures else HEALTH_RETRY_INTERVAL
+            try:
+                await asyncio.wait_for(self._wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @callback
+    def async_check_now(self) -> None:
+        """Probe right away, e.g. after a failed poll."""
+        self._poll_ok_at = None
+        self._wake.set()
+
+    @callback
+    def async_report_alive(self) -> None:
+        """Note a successful poll, which makes the next probe unnecessary."""
+        if self.available:
+            self.last_seen = self._poll_ok_at = time.monotonic()
+
+    async def _async_probe(self) -> None:
+        if (
+            self.available
+            and not self.failures
+            and self._poll_ok_at is not None
+            and time.monotonic() - self._poll_ok_at < HEALTH_INTERVAL
+        ):
+            return
+        start = time.monotonic()
+        alive = await self.client.ping(HEALTH_TIMEOUT)
+        if not alive:
+            self.failures += 1
+            if self.available and self.failures >= HEALTH_FAILURES:
+                await self._async_lost()
+            return
+
+        rtt = time.monotonic() - start
+        self.rtt = rtt if self.rtt is None else 0.8 * self.rtt + 0.2 * rtt
+        self.last_seen = time.monotonic()
+        self.failures = 0
+        if not self.available:
+            await self._async_recovered()
+
+    async def _async_lost(self) -> None:
+        _LOGGER.warning("CLU %s is not answering, suspending polling", self.client.host)
+        self.available = False
+        for poller in self.pollers:
+            # Refresh without network access, just to mark entities unavailable
+            await poller.async_refresh()
+
+    async def _async_recovered(self) -> None:
+        _LOGGER.info("CLU %s is back (%.0f ms), refreshing", self.client.host, self.rtt * 1000)
+        self.available = True
+        for poller in self.pollers:
+            await poller.async_refresh()
+        self._on_recovered()
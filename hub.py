@@ -0,0 +1,190 @@
+"""Module inventory and discovery for a single CLU."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONF_COMPACT_SNAPSHOT,
+    CONFIG_CHECK_INTERVAL,
+    FAST_POLL_INTERVAL,
+    POLL_INTERVAL,
+    SIGNAL_MODULE_REMOVED,
+    SIGNAL_MODULE_RENAMED,
+    SIGNAL_MODULES_ADDED,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from .coordinator import GrentonPoller
+from .health import GrentonHealthMonitor
+from .grenton import MAX_INPUT_FETCH_ITEMS, GrentonClient, diff_modules
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrentonHub:
+    """Keep track of the modules configured on a CLU.
+
+    The last known module list is cached in HA storage so entities can be
+    registered straight away on startup, while the real discovery runs in
+    the background and only adds what the cache did not know about.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: GrentonClient) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.entry = entry
+        self.client = client
+        compact = entry.options.get(CONF_COMPACT_SNAPSHOT, False)
+        self.poller = GrentonPoller(hass, client, 'values', POLL_INTERVAL, compact)
+        # Driven by its own loop in async_start, see GrentonPoller.async_run
+        self.fast_poller = GrentonPoller(hass, client, 'inputs', None, compact, MAX_INPUT_FETCH_ITEMS)
+        # A CLU that comes back may have been rebooted by a project upload
+        self.health = GrentonHealthMonitor(
+            client, [self.poller, self.fast_poller], self.async_schedule_discover
+        )
+        self.modules: list[dict] = []
+        self._fingerprint = None
+        self._stamp = None
+        self._discovery_lock = asyncio.Lock()
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry.entry_id))
+
+    async def async_load(self) -> None:
+        """Load the cached module snapshot."""
+        cached = await self._store.async_load()
+        if cached:
+            self.modules = cached.get('modules', [])
+            self._fingerprint = cached.get('fingerprint')
+            self._stamp = cached.get('stamp')
+            _LOGGER.debug("Restored %d modules from cache", len(self.modules))
+
+    @callback
+    def async_start(self) -> None:
+        """Start polling the inputs and watching the CLU for reachability and project changes."""
+        self.entry.async_create_background_task(self.hass, self.health.async_run(), "grenton_health")
+        self.entry.async_create_background_task(
+            self.hass, self.fast_poller.async_run(FAST_POLL_INTERVAL), "grenton_inputs"
+        )
+        self.entry.async_on_unload(
+            async_track_time_interval(
+                self.hass, self.async_check_project, timedelta(seconds=CONFIG_CHECK_INTERVAL)
+            )
+        )
+
+    async def async_discover(self, _now=None) -> None:
+        """Reconcile the module list with the CLU, on startup and recovery.
+
+        om.lua is downloaded and hashed every time, but only parsed and
+        diffed when its hash differs from the last run.
+        """
+        if self._discovery_lock.locked() or not self.health.available:
+            return
+        async with self._discovery_lock:
+            await self._async_discover()
+
+    @callback
+    def async_schedule_discover(self) -> None:
+        """Run a discovery in the background, the caller does not wait for om.lua."""
+        self.entry.async_create_background_task(
+            self.hass, self.async_discover(), "grenton_discovery"
+        )
+
+    async def async_check_project(self, _now=None) -> None:
+        """Periodic check, om.lua is only downloaded when the project stamp moved."""
+        if self._discovery_lock.locked() or not self.health.available:
+            return
+        async with self._discovery_lock:
+            try:
+                stamp = await self.client.read_project_stamp()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.debug("Project stamp could not be read", exc_info=True)
+                return
+            if stamp is not None and stamp == self._stamp:
+                return
+            await self._async_discover(stamp)
+
+    async def _async_discover(self, stamp: str | None = None) -> None:
+        known = self._fingerprint if self.modules else None
+        try:
+            if stamp is None:
+                # Read before om.lua, so a change in between shows up on the next check
+                stamp = await self.client.read_project_stamp()
+            fingerprint, modules = await self.client.read_project(known)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Module discovery failed, keeping cached modules")
+            return
+        if fingerprint is None:
+            _LOGGER.warning("Module discovery returned no data, keeping cached modules")
+            return
+        if modules is None:
+            # om.lua is byte for byte what we parsed last time
+            if stamp != self._stamp:
+                self._stamp = stamp
+                await self._async_save()
+            return
+        if self._fingerprint is not None:
+            _LOGGER.info("CLU project changed, updating modules")
+        await self._async_reconcile(modules, fingerprint, stamp)
+
+    async def _async_save(self) -> None:
+        await self._store.async_save(
+            {'modules': self.modules, 'fingerprint': self._fingerprint, 'stamp': self._stamp}
+        )
+
+    async def _async_reconcile(
+        self, modules: list[dict], fingerprint: str | None, stamp: str | None = None
+    ) -> None:
+        """Replace the module list and tell entities what changed."""
+        added, removed, changed = diff_modules(self.modules, modules)
+        renamed = []
+        for module in changed:
+            old = next(mod for mod in self.modules if mod['id'] == module['id'])
+            if old['type'] != module['type']:
+                # A different type means a different platform, recreate the entities
+                removed.append(old)
+                added.append(module)
+            else:
+                renamed.append(module)
+
+        self.modules = modules
+        self._fingerprint = fingerprint
+        self._stamp = stamp
+        await self._async_save()
+
+        entry_id = self.entry.entry_id
+        for module in removed:
+            async_dispatcher_send(self.hass, SIGNAL_MODULE_REMOVED.format(entry_id, module['id']))
+        for module in renamed:
+            async_dispatcher_send(self.hass, SIGNAL_MODULE_RENAMED.format(entry_id, module['id']), module)
+        if added:
+            async_dispatcher_send(self.hass, SIGNAL_MODULES_ADDED.format(entry_id), added)
+        _LOGGER.debug(
+            "Modules reconciled: %d added, %d removed, %d renamed",
+            len(added), len(removed), len(renamed)
+        )
+
+    @callback
+    def async_add_entities_for(self, async_add_entities, factory) -> None:
+        """Create entities for the known modules and for any discovered later.
+
+        `factory` takes a module and returns the list of entities for it.
+        """
+        @callback
+        def _add(modules):
+            entities = []
+            for module in modules:
+                entities.extend(factory(module))
+            if entities:
+                async_add_entities(entities)
+
+        _add(self.modules)
+        self.entry.async_on_unload(
+            async_dispatcher_connect(self.hass, SIGNAL_MODULES_ADDED.format(self.entry.entry_id), _add)
+        )
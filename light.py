@@ -1,6 +1,7 @@
 import logging
 from .const import DOMAIN
 from homeassistant.components.light import LightEntity, ColorMode, ATTR_BRIGHTNESS
+from .entity import GrentonEntity
 
 _LOGGER = logging.getLogger(__name__)
 CONF_ENCRYPTION_KEY = 'encryption_key'
@@ -13,44 +14,32 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the lights from a config entry."""
     _LOGGER.debug("Setting up lights from config entry")
 
-    client = hass.data[DOMAIN][config_entry.entry_id]['client']
-    # Get list of connected modules
-    modules = await client.list_modules()
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
 
-    lights = []
-    for module in modules:
+    def create_lights(module):
         # Check if the module is an RGBW module
         if module['type'] == 'led':
             # Generate 4 light entities, 1 for each channel
-            for channel in 'rgbw':
-                new_light = GrentonLight(client, module, channel)
-                lights.append(new_light)
+            return [GrentonLight(hub.poller, module, channel) for channel in 'rgbw']
+        return []
 
-    if lights:
-        _LOGGER.debug("Adding light entities")
-        async_add_entities(lights)
-    else:
-        _LOGGER.debug("No light entities available")
+    hub.async_add_entities_for(async_add_entities, create_lights)
 
-class GrentonLight(LightEntity):
+class GrentonLight(GrentonEntity, LightEntity):
     """Representation of a light."""
-    _attr_has_entity_name = True
     _attr_color_mode = ColorMode.BRIGHTNESS
     _attr_supported_color_modes = {ColorMode.BRIGHTNESS}
 
-    def __init__(self, client, module, channel):
+    def __init__(self, poller, module, channel):
         """Initialize the light."""
-        self._client = client
-        self._module = module
         self._channel = channel
-        self._name = module['name'] + '_' + channel
+        super().__init__(poller, module, [channel])
         self._attr_unique_id = module['id'] + '_' + channel
         self._brightness = None
 
-    @property
-    def name(self):
+    def _build_name(self, module):
         """Return the name of the light."""
-        return self._name
+        return module['name'] + '_' + self._channel
 
     @property
     def is_on(self):
@@ -73,14 +62,23 @@ class GrentonLight(LightEntity):
             brightness = 255
         await self._client.set_led_value(self._module['id'], self._channel, brightness)
         self._brightness = brightness
+        self._async_write_optimistic()
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
         _LOGGER.debug("Turning off light: %s", self._name)
         await self._client.set_led_value(self._module['id'], self._channel, 0)
         self._brightness = 0
+        self._async_write_optimistic()
+
+    def _restore_state(self, last_state):
+        """Show the last known brightness until the first poll."""
+        if last_state.state == 'off':
+            self._brightness = 0
+        elif (brightness := last_state.attributes.get(ATTR_BRIGHTNESS)) is not None:
+            self._brightness = brightness
 
-    async def async_update(self):
-        """Fetch new state data for the switch."""
-        _LOGGER.debug("Updating light: %s", self._name)
-        self._brightness = int(await self._client.get_led_state(self._module['id'], self._channel))
+    def _update_from_state(self, state):
+        """Apply polled state data for the light."""
+        if state[self._channel] is not None:
+            self._brightness = state[self._channel]
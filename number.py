@@ -0,0 +1,57 @@
+import logging
+from .const import DOMAIN
+from homeassistant.components.number import NumberEntity
+from homeassistant.const import UnitOfElectricPotential
+from .entity import GrentonEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Set up the analog outputs from a config entry."""
+    _LOGGER.debug("Setting up analog outputs from config entry")
+
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
+
+    def create_numbers(module):
+        # Check if the module is an analog output
+        if module['type'] == 'a_out':
+            return [GrentonAnalogOutput(hub.poller, module)]
+        return []
+
+    hub.async_add_entities_for(async_add_entities, create_numbers)
+
+class GrentonAnalogOutput(GrentonEntity, NumberEntity):
+    """Representation of a 0-10V analog output."""
+    _attr_native_min_value = 0
+    _attr_native_max_value = 10
+    _attr_native_step = 0.1
+    _attr_native_unit_of_measurement = UnitOfElectricPotential.VOLT
+
+    def __init__(self, poller, module):
+        """Initialize the analog output."""
+        super().__init__(poller, module)
+        self._attr_unique_id = module['id']
+        self._value = None
+
+    @property
+    def native_value(self):
+        """Return the output voltage."""
+        return self._value
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the output voltage."""
+        _LOGGER.debug("Setting analog output %s to %s", self._name, value)
+        await self._client.set_module_value(self._module['id'], 0, value)
+        self._value = value
+        self._async_write_optimistic()
+
+    def _restore_state(self, last_state):
+        """Show the last known output voltage until the first poll."""
+        try:
+            self._value = float(last_state.state)
+        except ValueError:
+            pass
+
+    def _update_from_state(self, state):
+        """Apply polled state data for the analog output."""
+        self._value = state['value']
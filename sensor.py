@@ -1,6 +1,7 @@
 import logging
 from .const import DOMAIN
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from .entity import GrentonEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,49 +12,39 @@ from .grenton import GrentonClient
 SENSOR_TYPES = {
     'touch_senstemp': ['Temperature', '°C'],
     '1w_temp': ['Temperature', '°C'],
-    'touch_senslight': ['Light', '%']
+    'touch_senslight': ['Light', '%'],
+    'psuvoltage': ['Voltage', 'V'],
 }
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the switches from a config entry."""
     _LOGGER.debug("Setting up sensors from config entry")
 
-    client = hass.data[DOMAIN][config_entry.entry_id]['client']
-    # Get list of connected modules
-    modules = await client.list_modules()
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
 
-    sensors = []
-    for module in modules:
-        # Check if the module has switch capability
+    def create_sensors(module):
+        # Check if the module has sensor capability
         if module['type'] in SENSOR_TYPES:
-            new_sensor = GrentonSensor(client, module)
-            sensors.append(new_sensor)
+            return [GrentonSensor(hub.poller, module)]
+        return []
 
-    if sensors:
-        _LOGGER.debug("Adding sensors entities")
-        async_add_entities(sensors)
-    else:
-        _LOGGER.debug("No sensors entities available")
+    hub.async_add_entities_for(async_add_entities, create_sensors)
 
-class GrentonSensor(SensorEntity):
+class GrentonSensor(GrentonEntity, SensorEntity):
     """Representation of a sensor."""
-    _attr_has_entity_name = True
     _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
 
-    def __init__(self, client, module):
+    def __init__(self, poller, module):
         """Initialize the sensor."""
-        self._client = client
-        self._module = module
+        super().__init__(poller, module)
         self._sensor_type = module['type']
-        self._name = f"{module['name']} {SENSOR_TYPES[module['type']][0]}"
         self._attr_unique_id = module['id']
         self._state = None
         self._unit_of_measurement = SENSOR_TYPES[module['type']][1]
 
-    @property
-    def name(self):
+    def _build_name(self, module):
         """Return the name of the sensor."""
-        return self._name
+        return f"{module['name']} {SENSOR_TYPES[module['type']][0]}"
 
     @property
     def state(self):
@@ -65,7 +56,13 @@ class GrentonSensor(SensorEntity):
         """Return the unit of measurement."""
         return self._unit_of_measurement
 
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        _LOGGER.debug("Updating sensor: %s", self._name)
-        self._state = await self._client.get_sensor_value(self._module['id'])
\ No newline at end of file
+    def _restore_state(self, last_state):
+        """Show the last known reading until the first poll."""
+        try:
+            self._state = float(last_state.state)
+        except ValueError:
+            pass
+
+    def _update_from_state(self, state):
+        """Apply polled state data for the sensor."""
+        self._state = state['value']
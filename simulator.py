@@ -0,0 +1,132 @@
+"""A local stand-in for a CLU, for load testing without hardware.
+
+It speaks the same encrypted UDP protocol and answers checkAlive(),
+SYSTEM:fetchValues(), set() and execute(), and emulates the compact
+snapshot helper. It does not serve TFTP.
+"""
+import asyncio
+import random
+import re
+
+try:
+    from .grenton import GrentonClient
+except ImportError:
+    from grenton import GrentonClient
+
+FETCH_ITEM = re.compile(r'\{([^{},]+),\s*(\d+)\}')
+SET_CALL = re.compile(r'^(\w+):set\((\d+),\s*([^)]*)\)$')
+SNAPSHOT_CALL = re.compile(r"^HA_SNAP\('(\w+)',(-?\d+)\)$")
+SNAPSHOT_RESET = re.compile(r"HA_SN\['(\w+)'\]=\{k=")
+SNAPSHOT_APPEND = re.compile(r"HA_SN\['(\w+)'\]\.k ")
+
+
+class SimulatedClu(asyncio.DatagramProtocol):
+    """Answer CLU requests from an in-memory value table."""
+
+    def __init__(self, base64_key, base64_iv, serial='0123456789', latency=0.0):
+        # Reuse the client's cipher helpers, the CLU uses the same key and IV
+        self._crypto = GrentonClient('127.0.0.1', base64_key=base64_key, base64_iv=base64_iv, source_ip='127.0.0.1')
+        self.serial = serial
+        self.latency = latency
+        self.values = {}
+        self.snapshots = {}
+        self.snapshot_function = False
+        self.requests = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        try:
+            message = self._crypto.decrypt(data)
+        except (ValueError, UnicodeDecodeError):
+            return
+        reply = self.handle(message)
+        if reply is None:
+            return
+        payload = self._crypto.encrypt(reply)
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, payload, addr)
+        else:
+            self.transport.sendto(payload, addr)
+
+    def handle(self, message):
+        """Return the plain text reply to a request, None to stay silent."""
+        if message == 'req_start_ftp':
+            # Refuse, so file reads fail straight away instead of timing out
+            return 'resp:NOT_SUPPORTED'
+        match = re.match(r'req:([^:]*):([0-9a-f]+):(.*)', message, re.S)
+        if not match:
+            return None
+        source, cmd_id, command = match.groups()
+        return f'resp:{source}:{cmd_id}:{self.execute(command)}'
+
+    def execute(self, command):
+        """Evaluate the small subset of Lua the integration sends."""
+        if command == 'checkAlive()':
+            return self.serial
+        if command.startswith('SYSTEM:fetchValues('):
+            values = [self.value(module_id, int(index)) for module_id, index in FETCH_ITEM.findall(command)]
+            return '{' + ','.join(values) + '}'
+        match = SNAPSHOT_CALL.match(command)
+        if match:
+            return self.snapshot(match.group(1), int(match.group(2)))
+        match = SNAPSHOT_RESET.search(command)
+        if match:
+            self.snapshots[match.group(1)] = {'k': [], 'v': [], 's': 0}
+            return '1'
+        match = SNAPSHOT_APPEND.search(command)
+        if match:
+            keys = self.snapshots[match.group(1)]['k']
+            keys.extend((module_id, int(index)) for module_id, index in FETCH_ITEM.findall(command))
+            return str(len(keys))
+        if command.startswith('(function() HA_SNAP=function'):
+            self.snapshot_function = True
+            return '1'
+        match = SET_CALL.match(command)
+        if match:
+            module_id, index, value = match.groups()
+            self.values[(module_id, int(index))] = value.strip()
+            return 'nil'
+        # execute() and anything else just succeeds
+        return 'nil'
+
+    def snapshot(self, name, seq):
+        """Mirror HA_SNAP on the CLU: full reply on a sequence mismatch, else changes only."""
+        if not self.snapshot_function or name not in self.snapshots:
+            return 'attempt to call a nil value'
+        table = self.snapshots[name]
+        full = seq != table['s']
+        out = []
+        for slot, (module_id, index) in enumerate(table['k']):
+            value = self.value(module_id, index)
+            if full:
+                out.append(value)
+            elif slot >= len(table['v']) or value != table['v'][slot]:
+                out.append(f'{slot + 1}={value}')
+        table['v'] = [self.value(module_id, index) for module_id, index in table['k']]
+        table['s'] += 1
+        return f"{table['s']}|{'F' if full else 'D'}|{';'.join(out)}"
+
+    def reboot(self):
+        """Forget everything installed at runtime, like a real CLU restart."""
+        self.snapshots.clear()
+        self.snapshot_function = False
+
+    def value(self, module_id, index):
+        """Return a stored value, inventing one the first time it is read."""
+        key = (module_id, index)
+        if key not in self.values:
+            self.values[key] = str(random.randint(0, 1))
+        return self.values[key]
+
+
+async def start_simulator(base64_key, base64_iv, host='127.0.0.1', port=0, **kwargs):
+    """Start a simulated CLU, returns (transport, protocol, bound port)."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: SimulatedClu(base64_key, base64_iv, **kwargs), local_addr=(host, port)
+    )
+    return transport, protocol, transport.get_extra_info('sockname')[1]
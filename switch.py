@@ -1,6 +1,7 @@
 import logging
 from .const import DOMAIN
 from homeassistant.components.switch import SwitchEntity
+from .entity import GrentonEntity
 
 _LOGGER = logging.getLogger(__name__)
 CONF_ENCRYPTION_KEY = 'encryption_key'
@@ -13,40 +14,25 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the switches from a config entry."""
     _LOGGER.debug("Setting up switches from config entry")
 
-    client = hass.data[DOMAIN][config_entry.entry_id]['client']
-    # Get list of connected modules
-    modules = await client.list_modules()
+    hub = hass.data[DOMAIN][config_entry.entry_id]['hub']
 
-    switches = []
-    for module in modules:
+    def create_switches(module):
         # Check if the module has switch capability
         if module['type'] == 'd_out':
-            new_switch = GrentonSwitch(client, module)
-            switches.append(new_switch)
+            return [GrentonSwitch(hub.poller, module)]
+        return []
 
-    if switches:
-        _LOGGER.debug("Adding switch entities")
-        async_add_entities(switches)
-    else:
-        _LOGGER.debug("No switch entities available")
+    hub.async_add_entities_for(async_add_entities, create_switches)
 
-class GrentonSwitch(SwitchEntity):
+class GrentonSwitch(GrentonEntity, SwitchEntity):
     """Representation of a switch."""
-    _attr_has_entity_name = True
 
-    def __init__(self, client, module):
+    def __init__(self, poller, module):
         """Initialize the switch."""
-        self._client = client
-        self._module = module
-        self._name = module['name']
+        super().__init__(poller, module)
         self._attr_unique_id = module['id']
         self._state = None
 
-    @property
-    def name(self):
-        """Return the name of the switch."""
-        return self._name
-
     @property
     def is_on(self):
         """Return true if the switch is on."""
@@ -57,15 +43,21 @@ class GrentonSwitch(SwitchEntity):
         _LOGGER.debug("Turning on switch: %s", self._name)
         await self._client.set_switch_state(self._module['id'], True)
         self._state = 'on'
+        self._async_write_optimistic()
 
     async def async_turn_off(self, **kwargs):
         """Turn the switch off."""
         _LOGGER.debug("Turning off switch: %s", self._name)
         await self._client.set_switch_state(self._module['id'], False)
         self._state = 'off'
+        self._async_write_optimistic()
+
+    def _restore_state(self, last_state):
+        """Show the last known switch state until the first poll."""
+        if last_state.state in ('on', 'off'):
+            self._state = last_state.state
 
-    async def async_update(self):
-        """Fetch new state data for the switch."""
-        _LOGGER.debug("Updating switch: %s", self._name)
-        state = await self._client.get_switch_state(self._module['id'])
-        self._state = 'on' if state else 'off'
+    def _update_from_state(self, state):
+        """Apply polled state data for the switch."""
+        if state['state'] is not None:
+            self._state = 'on' if state['state'] == 1 else 'off'
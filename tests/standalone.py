@@ -0,0 +1,14 @@
+"""Collect the tests without importing the integration package.
+
+The repository root is the integration itself, and pytest would import
+its __init__.py, which needs Home Assistant, before any test runs. The
+client and simulator under test do not, so the root is collected as a
+plain directory instead.
+"""
+import pytest
+
+
+def pytest_collect_directory(path, parent):
+    if path == parent.config.rootpath:
+        return pytest.Dir.from_parent(parent, path=path)
+    return None
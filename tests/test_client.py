@@ -0,0 +1,72 @@
+"""Tests for request pacing in the client, against the simulated CLU."""
+import asyncio
+from base64 import b64encode
+
+from grenton import MAX_READ_IN_FLIGHT, GrentonClient
+from simulator import start_simulator
+
+KEY = b64encode(bytes(range(16))).decode()
+IV = b64encode(bytes(range(16, 32))).decode()
+
+
+def run_with_simulator(test, latency=0.0, **client_args):
+    async def runner():
+        transport, clu, port = await start_simulator(KEY, IV, latency=latency)
+        client = GrentonClient('127.0.0.1', udp_port=port, base64_key=KEY, base64_iv=IV, **client_args)
+        try:
+            await test(client, clu)
+        finally:
+            client.close()
+            transport.close()
+
+    asyncio.run(runner())
+
+
+def test_concurrent_commands_are_spaced_by_the_interval():
+    async def test(client, clu):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(client.ping() for _ in range(6)))
+        # The first command goes out straight away, each later one waits its turn
+        assert loop.time() - start >= 5 * 0.05
+        assert clu.requests == 6
+
+    run_with_simulator(test, command_interval=0.05)
+
+
+def test_in_flight_commands_are_capped():
+    async def test(client, clu):
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, len(client._pending))
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.create_task(watch())
+        keys = [(f'DIN{i:04d}', 0) for i in range(1000)]
+        await asyncio.gather(client.fetch_values(keys, 100), client.fetch_values(keys, 100))
+        watcher.cancel()
+        assert peak == 3
+
+    run_with_simulator(test, latency=0.05, command_interval=0, max_in_flight=3)
+
+
+def test_chunks_of_one_read_are_capped():
+    async def test(client, clu):
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, len(client._pending))
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.create_task(watch())
+        values = await client.fetch_values([(f'DIN{i:04d}', 0) for i in range(1000)], 100)
+        watcher.cancel()
+        assert len(values) == 1000
+        assert peak == MAX_READ_IN_FLIGHT
+
+    run_with_simulator(test, latency=0.05, command_interval=0)
@@ -0,0 +1,30 @@
+"""Tests for project change detection."""
+import struct
+
+from grenton import OACK_OPCODE, diff_modules, parse_oack
+
+
+def test_diff_modules():
+    old = [
+        {'id': 'DOU1', 'name': 'Lamp', 'type': 'd_out'},
+        {'id': 'DOU2', 'name': 'Fan', 'type': 'd_out'},
+    ]
+    new = [
+        {'id': 'DOU1', 'name': 'Desk lamp', 'type': 'd_out'},
+        {'id': 'DIN3', 'name': 'Door', 'type': 'd_in'},
+    ]
+    added, removed, changed = diff_modules(old, new)
+    assert [mod['id'] for mod in added] == ['DIN3']
+    assert [mod['id'] for mod in removed] == ['DOU2']
+    assert changed == [new[0]]
+
+
+def test_diff_modules_unchanged():
+    modules = [{'id': 'DOU1', 'name': 'Lamp', 'type': 'd_out'}]
+    assert diff_modules(modules, [dict(mod) for mod in modules]) == ([], [], [])
+
+
+def test_parse_oack():
+    packet = struct.pack('!H', OACK_OPCODE) + b'TSIZE\x0012345\x00blksize\x00512\x00'
+    assert parse_oack(packet) == {'tsize': '12345', 'blksize': '512'}
+    assert parse_oack(struct.pack('!H', OACK_OPCODE)) == {}
@@ -0,0 +1,39 @@
+"""Tests for the schema driven fetch planner."""
+from grenton import (
+    MAX_REQUEST_LENGTH,
+    REQUEST_OVERHEAD,
+    attribute_fields,
+    attribute_keys,
+    decode_fields,
+    plan_fetch,
+)
+
+
+def test_plan_fetch_dedups_and_orders():
+    plan = plan_fetch([('DOU2', 0), ('DOU1', 0), ('DOU2', 0)])
+    assert plan == [('SYSTEM:fetchValues({{DOU1,0},{DOU2,0}})', [('DOU1', 0), ('DOU2', 0)])]
+
+
+def test_plan_fetch_respects_item_and_length_limits():
+    keys = [(f'DIN{i:04d}', 0) for i in range(250)]
+    plan = plan_fetch(keys, max_items=40)
+    assert [key for _, chunk in plan for key in chunk] == keys
+    assert all(len(chunk) <= 40 for _, chunk in plan)
+
+    plan = plan_fetch(keys, max_items=1000)
+    assert len(plan) > 1
+    wrapper = len('SYSTEM:fetchValues({})')
+    assert all(len(command) - wrapper <= MAX_REQUEST_LENGTH - REQUEST_OVERHEAD for command, _ in plan)
+
+
+def test_attribute_keys_from_schema():
+    module = {'id': 'ZWA1', 'type': 'shutter'}
+    assert attribute_keys(module) == {('ZWA1', 0), ('ZWA1', 7)}
+    assert attribute_keys(module, ['position']) == {('ZWA1', 7)}
+
+
+def test_decode_fields_types_and_missing():
+    module = {'id': 'THE1', 'type': 'thermostat'}
+    fields = attribute_fields(module, ['currentTemp', 'on', 'mode'])
+    state = decode_fields(fields, {('THE1', 14): '21.5', ('THE1', 6): '1.0', ('THE1', 8): 'nil'})
+    assert state == {'currentTemp': 21.5, 'on': 1, 'mode': None}
@@ -0,0 +1,143 @@
+"""Tests for compact snapshots, against the simulated CLU."""
+import asyncio
+from base64 import b64encode
+
+from grenton import (
+    MAX_FETCH_ITEMS,
+    MAX_INPUT_FETCH_ITEMS,
+    MAX_REQUEST_LENGTH,
+    GrentonClient,
+    decode_snapshot,
+    plan_snapshot_install,
+    plan_snapshot_segments,
+)
+from simulator import start_simulator
+
+KEY = b64encode(bytes(range(16))).decode()
+IV = b64encode(bytes(range(16, 32))).decode()
+KEYS = [(f'DIN{i:04d}', 0) for i in range(250)]
+# Largest UDP payload that is not fragmented on Ethernet
+MAX_DATAGRAM = 1472
+
+
+def test_decode_full():
+    values = [None] * 3
+    assert decode_snapshot('4|F|1;0;21.5', values) == 4
+    assert values == ['1', '0', '21.5']
+
+
+def test_decode_delta():
+    values = ['1', '0', '21.5']
+    assert decode_snapshot('5|D|2=1;3=22', values) == 5
+    assert values == ['1', '1', '22']
+    assert decode_snapshot('6|D|', values) == 6
+    assert values == ['1', '1', '22']
+
+
+def test_decode_rejects_wrong_length_and_errors():
+    values = [None] * 3
+    assert decode_snapshot('4|F|1;0', values) is None
+    assert values == [None] * 3
+    assert decode_snapshot('attempt to call a nil value', values) is None
+
+
+def test_install_commands_fit_one_request():
+    commands = plan_snapshot_install('inputs', KEYS)
+    assert all(len(command) < MAX_REQUEST_LENGTH for command in commands)
+
+
+def test_segments_are_stable_and_capped():
+    segments = plan_snapshot_segments('inputs', list(reversed(KEYS)) + KEYS[:10], 100)
+    assert [name for name, _ in segments] == ['inputs_0', 'inputs_1', 'inputs_2']
+    assert [len(keys) for _, keys in segments] == [100, 100, 50]
+    assert [key for _, keys in segments for key in keys] == KEYS
+
+
+def run_with_simulator(test):
+    async def runner():
+        transport, clu, port = await start_simulator(KEY, IV)
+        client = GrentonClient('127.0.0.1', udp_port=port, base64_key=KEY, base64_iv=IV, command_interval=0)
+        try:
+            await test(client, clu)
+        finally:
+            client.close()
+            transport.close()
+
+    asyncio.run(runner())
+
+
+def record_snapshot_replies(clu):
+    """Collect the plain text snapshot replies the simulated CLU sends."""
+    replies = []
+    snapshot = clu.snapshot
+
+    def recording(name, seq):
+        reply = snapshot(name, seq)
+        replies.append(reply)
+        return reply
+
+    clu.snapshot = recording
+    return replies
+
+
+def test_sequence_mismatch_returns_full_snapshot():
+    async def test(client, clu):
+        replies = record_snapshot_replies(clu)
+        await client.fetch_snapshot('inputs', KEYS, MAX_INPUT_FETCH_ITEMS)
+        await client.fetch_snapshot('inputs', KEYS, MAX_INPUT_FETCH_ITEMS)
+        assert [reply.split('|')[1] for reply in replies] == ['F'] * 3 + ['D'] * 3
+
+        # As if a reply had been lost, the client is one sequence behind
+        client._snapshots['inputs_1']['seq'] -= 1
+        clu.values[('DIN0150', 0)] = '7'
+        replies.clear()
+        values = await client.fetch_snapshot('inputs', KEYS, MAX_INPUT_FETCH_ITEMS)
+        assert sorted(reply.split('|')[1] for reply in replies) == ['D', 'D', 'F']
+        assert values == await client.fetch_values(KEYS)
+        assert values[('DIN0150', 0)] == '7'
+
+    run_with_simulator(test)
+
+
+def test_full_replies_fit_one_datagram():
+    async def test(client, clu):
+        replies = record_snapshot_replies(clu)
+        inputs = [(f'DIN{i:04d}', 0) for i in range(1000)]
+        sensors = [(f'SEN{i:04d}', 0) for i in range(1000)]
+        for key in sensors:
+            clu.values[key] = '-1234.5678901234'
+        await client.fetch_snapshot('inputs', inputs, MAX_INPUT_FETCH_ITEMS)
+        await client.fetch_snapshot('values', sensors, MAX_FETCH_ITEMS)
+        assert len(replies) == 10 + 25
+        assert all(reply.split('|')[1] == 'F' for reply in replies)
+        header = 'resp:255.255.255.255:ffffff:'
+        assert max(len(clu._crypto.encrypt(header + reply)) for reply in replies) <= MAX_DATAGRAM
+
+    run_with_simulator(test)
+
+
+def test_fetch_snapshot_matches_fetch_values_and_sends_only_changes():
+    async def test(client, clu):
+        full = await client.fetch_snapshot('inputs', KEYS)
+        assert full == await client.fetch_values(KEYS)
+
+        clu.values[('DIN0005', 0)] = '7'
+        requests = clu.requests
+        changed = await client.fetch_snapshot('inputs', KEYS)
+        # One call per segment, nothing reinstalled
+        assert clu.requests == requests + len(plan_snapshot_segments('inputs', KEYS))
+        assert changed[('DIN0005', 0)] == '7'
+
+    run_with_simulator(test)
+
+
+def test_fetch_snapshot_reinstalls_after_reboot():
+    async def test(client, clu):
+        before = await client.fetch_snapshot('inputs', KEYS)
+        clu.reboot()
+        clu.values[('DIN0010', 0)] = '5'
+        after = await client.fetch_snapshot('inputs', KEYS)
+        assert after == {**before, ('DIN0010', 0): '5'}
+        assert 'inputs_0' in clu.snapshots
+
+    run_with_simulator(test)